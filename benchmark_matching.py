@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark Template-Matching: Vollbild (alte Methode) gegen ROI + Pyramide
+
+Vergleicht auf aufgezeichneten Screenshots die alte Suche (cv2.matchTemplate über den
+ganzen Screenshot in voller Auflösung, TM_CCOEFF_NORMED >= Schwelle) mit der
+TemplateBank-Suche aus lkw_bot_web.py und prüft, ob dieselben Treffer gefunden werden.
+
+Aufruf:
+    python3 benchmark_matching.py --frames recorded_frames/
+    python3 benchmark_matching.py --frames recorded_frames/ --roi 0,200,720,1150
+    python3 benchmark_matching.py --frames recorded_frames/ --no-roi
+    python3 benchmark_matching.py --record 20 --port 5839 --frames recorded_frames/
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+from lkw_bot_web import (LKW_MATCH_THRESHOLD, LKW_SEARCH_ROIS, LKW_TEMPLATE_FILE, TemplateBank,
+                         adb_screencap_stream)
+
+
+def record_frames(port, count, directory):
+    """Nimmt Screenshots vom Gerät auf und speichert sie als PNG"""
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        frame = adb_screencap_stream(f'localhost:{port}')
+        path = os.path.join(directory, f'frame_{int(time.time() * 1000)}_{i:03d}.png')
+        cv2.imwrite(path, frame)
+        print(f"Aufgenommen: {path}")
+        time.sleep(1)
+
+
+def full_frame_hits(frame, template, threshold):
+    """Alte Methode aus rentier_lkw_finden: Vollbild, volle Auflösung, alle Pixel über der Schwelle"""
+    result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+    ys, xs = np.where(result >= threshold)
+    return set(zip(xs.tolist(), ys.tolist()))
+
+
+def inside_rois(hit, size, rois):
+    if not rois:
+        return True
+    x, y = hit
+    w, h = size
+    return any(x1 <= x and y1 <= y and x + w <= x2 and y + h <= y2 for x1, y1, x2, y2 in rois)
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', default='recorded_frames', help='Ordner mit aufgezeichneten Screenshots (PNG)')
+    parser.add_argument('--roi', action='append', help='Suchbereich x1,y1,x2,y2 (mehrfach möglich, Standard: LKW_SEARCH_ROIS)')
+    parser.add_argument('--no-roi', action='store_true', help='Ohne Suchbereiche (nur Pyramide)')
+    parser.add_argument('--threshold', type=float, default=LKW_MATCH_THRESHOLD)
+    parser.add_argument('--repeat', type=int, default=5, help='Wiederholungen pro Frame für die Zeitmessung')
+    parser.add_argument('--record', type=int, default=0, help='Vorher N Screenshots vom Gerät aufnehmen')
+    parser.add_argument('--port', type=int, help='Lokaler ADB-Port für --record')
+    args = parser.parse_args()
+
+    if args.record:
+        if not args.port:
+            parser.error('--record braucht --port')
+        record_frames(args.port, args.record, args.frames)
+
+    if args.no_roi:
+        rois = None
+    else:
+        rois = [tuple(int(v) for v in roi.split(',')) for roi in args.roi] if args.roi else LKW_SEARCH_ROIS
+    files = sorted(glob.glob(os.path.join(args.frames, '*.png')))
+    if not files:
+        parser.error(f"Keine PNG-Dateien in '{args.frames}' gefunden")
+
+    template = cv2.imread(LKW_TEMPLATE_FILE)
+    size = (template.shape[1], template.shape[0])
+    # Nur das Haupt-Template, damit die Treffer 1:1 mit der alten Methode vergleichbar sind
+    bank = TemplateBank([LKW_TEMPLATE_FILE])
+
+    total_old = total_new = 0.0
+    identical = 0
+    print(f"{'Frame':<40} {'alt ms':>8} {'neu ms':>8} {'Faktor':>7} {'Treffer':>8} {'fehlend':>8} {'extra':>6} "
+          f"{'außerhalb ROI':>14} {'LKWs (NMS)':>11}")
+    for path in files:
+        frame = cv2.imread(path)
+        old_hits, old_ms = timed(lambda: full_frame_hits(frame, template, args.threshold), args.repeat)
+        new_matches, new_ms = timed(lambda: bank.match(frame, args.threshold, rois=rois, pyramid=True, nms=False), args.repeat)
+        new_hits = {(m.x, m.y) for m in new_matches}
+        detections = bank.match(frame, args.threshold, rois=rois, pyramid=True)
+
+        expected = {hit for hit in old_hits if inside_rois(hit, size, rois)}
+        missing = expected - new_hits
+        extra = new_hits - expected
+        identical += not missing and not extra
+        total_old += old_ms
+        total_new += new_ms
+        print(f"{os.path.basename(path):<40} {old_ms:8.1f} {new_ms:8.1f} {old_ms / new_ms:6.1f}x "
+              f"{len(expected):8d} {len(missing):8d} {len(extra):6d} {len(old_hits) - len(expected):14d} "
+              f"{len(detections):11d}")
+
+    print()
+    print(f"Frames: {len(files)}, Suchbereiche: {rois or 'ganzer Bildschirm'}")
+    print(f"Mittel alt: {total_old / len(files):.1f} ms, neu: {total_new / len(files):.1f} ms, "
+          f"Beschleunigung: {total_old / total_new:.1f}x")
+    print(f"Identische Treffer: {identical}/{len(files)} Frames")
+    distribution = bank.score_distribution()
+    print("Score-Verteilung der lokalen Maxima:")
+    for label, count in zip(distribution['bins'], distribution['counts']):
+        if count:
+            print(f"  {label}: {count}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark OCR: alte Tesseract-Durchgänge gegen Vorverarbeitung (OCR_PIPELINES)
+
+Liest Stärke und Server aus aufgezeichneten Info-Screenshots einmal wie früher
+(--psm 7/8/6 nacheinander bis ein 'M' kommt, Server zweimal) und einmal mit
+InfoPanelReading aus lkw_bot_web.py. Ausgegeben werden Erfolgsquote im ersten
+Durchgang und mittlere OCR-Aufrufe pro LKW. Mit --labels (labels.tsv aus
+build_glyph_bank.py prepare) wird zusätzlich die Richtigkeit geprüft.
+
+Aufruf:
+    python3 benchmark_ocr.py --frames info_frames/
+    python3 benchmark_ocr.py --frames info_frames/ --labels glyph_crops/labels.tsv --glyphs
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import cv2
+
+import lkw_bot_web
+from lkw_bot_web import (SERVER_BOX, STAERKE_BOX, STAERKE_OCR_CONFIGS, InfoPanelReading, OcrCache, frame_crop,
+                         ocr_service)
+
+
+def old_reading(frame):
+    """Stärke und Server wie vor der Vorverarbeitung; gibt (stärke, server, aufrufe) zurück"""
+    calls = 0
+    staerke = ''
+    staerke_img = frame_crop(frame, STAERKE_BOX)
+    for config in STAERKE_OCR_CONFIGS:
+        calls += 1
+        text = ocr_service.image_to_string(staerke_img, config=config).strip()
+        if text and 'm' in text.lower():
+            staerke = text
+            break
+    server_img = frame_crop(frame, SERVER_BOX)
+    server = ocr_service.image_to_string(server_img).strip()
+    ocr_service.image_to_string(server_img)  # ist_server_passend + ocr_server lasen den Server zweimal
+    return staerke, server, calls + 2
+
+
+def load_labels(path):
+    """labels.tsv (Datei<TAB>Text) -> {frame_name: {'staerke': ..., 'server': ...}}"""
+    labels = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            name, _, text = line.rstrip('\n').partition('\t')
+            frame_name, _, kind = os.path.splitext(name)[0].rpartition('_')
+            if frame_name and text:
+                labels.setdefault(frame_name, {})[kind] = text.replace(' ', '')
+    return labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', default='info_frames', help='Ordner mit Info-Screenshots (PNG, 720x1280)')
+    parser.add_argument('--labels', help='labels.tsv mit den richtigen Werten')
+    parser.add_argument('--glyphs', action='store_true', help='Glyphen-Bank wie im Bot zuerst verwenden')
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.frames, '*.png')))
+    if not files:
+        parser.error(f"Keine PNG-Dateien in '{args.frames}' gefunden")
+    labels = load_labels(args.labels) if args.labels else {}
+    if not args.glyphs:
+        lkw_bot_web.glyph_classifier.path = None
+    # Ohne Cache, damit jeder Aufruf wirklich gezählt wird
+    ocr_service.cache = OcrCache(size=0, path=None)
+
+    old_calls = new_calls = first_pass = 0
+    old_ms = new_ms = 0.0
+    old_correct = new_correct = checked = 0
+    print(f"{'Frame':<40} {'alt':>14} {'Aufr.':>5} {'neu':>14} {'Aufr.':>5} {'1. Durchg.':>10}")
+    for path in files:
+        frame = cv2.imread(path)
+        name = os.path.splitext(os.path.basename(path))[0]
+
+        start = time.perf_counter()
+        staerke_alt, server_alt, calls_alt = old_reading(frame)
+        old_ms += (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        reading = InfoPanelReading(frame)
+        staerke_neu, server_neu = reading.staerke, reading.server_text or ''
+        new_ms += (time.perf_counter() - start) * 1000
+
+        old_calls += calls_alt
+        new_calls += reading.ocr_calls
+        first_pass += reading.first_pass
+        expected = labels.get(name)
+        if expected:
+            checked += 1
+            old_correct += (staerke_alt.replace(' ', ''), server_alt.replace(' ', '')) == \
+                (expected.get('staerke'), expected.get('server'))
+            new_correct += (staerke_neu.replace(' ', ''), server_neu.replace(' ', '')) == \
+                (expected.get('staerke'), expected.get('server'))
+        print(f"{name:<40} {staerke_alt + ' ' + server_alt:>14} {calls_alt:5d} "
+              f"{staerke_neu + ' ' + server_neu:>14} {reading.ocr_calls:5d} {'ja' if reading.first_pass else 'nein':>10}")
+
+    count = len(files)
+    print()
+    print(f"LKWs: {count}")
+    print(f"Erfolg im ersten Durchgang: {first_pass / count:.0%}")
+    print(f"OCR-Aufrufe pro LKW: alt {old_calls / count:.2f}, neu {new_calls / count:.2f}")
+    print(f"Zeit pro LKW: alt {old_ms / count:.0f} ms, neu {new_ms / count:.0f} ms")
+    if checked:
+        print(f"Richtig (Stärke + Server): alt {old_correct}/{checked}, neu {new_correct}/{checked}")
+
+
+if __name__ == '__main__':
+    main()
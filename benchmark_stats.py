@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark LKW-Statistik: lineare Suche (alte Methode) gegen sortierten Zeitindex
+
+Erzeugt synthetische Tagesdateien (Standard: 1 Mio. LKWs über 30 Tage) in einem eigenen
+Ordner und misst Zeitraum-Abfragen wie /api/admin/stats: einmal wie früher (alle Einträge
+lesen, jeden Zeitstempel parsen und vergleichen) und einmal über TruckStatsStore.query
+(Binärsuche im Index, nur die angeforderte Seite lesen).
+
+Aufruf:
+    python3 benchmark_stats.py
+    python3 benchmark_stats.py --records 1000000 --days 30 --limit 100 --dir /tmp/stats_bench
+    python3 benchmark_stats.py --dir /tmp/stats_bench --reuse --skip-old
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytz
+
+from lkw_bot_web import TruckStatsStore, stats_zeitpunkt
+
+
+def generate(directory, records, days):
+    """Schreibt records LKWs gleichmäßig verteilt auf die letzten days Tage"""
+    os.makedirs(directory, exist_ok=True)
+    tz = pytz.timezone('Europe/Berlin')
+    ende = datetime.now(tz).replace(microsecond=0)
+    beginn = ende - timedelta(days=days)
+    schritt = (ende - beginn).total_seconds() / records
+    rng = random.Random(1)
+    dateien = {}
+    try:
+        for i in range(records):
+            zeit = tz.normalize(beginn + timedelta(seconds=i * schritt)).isoformat()
+            record = {'strength': f"{rng.uniform(5, 120):.1f}M".replace('.', ','), 'server': str(rng.randint(1, 400)),
+                      'timestamp': zeit, 'user': rng.choice(['admin', 'ben', 'gast'])}
+            day = zeit[:10]
+            if day not in dateien:
+                dateien[day] = open(os.path.join(directory, f"{day}.jsonl"), 'w', encoding='utf-8')
+            dateien[day].write(json.dumps(record) + '\n')
+    finally:
+        for f in dateien.values():
+            f.close()
+    return beginn.replace(tzinfo=None), ende.replace(tzinfo=None)
+
+
+def old_query(store, start_str, end_str):
+    """Alte api_admin_stats: alles lesen, Start/Ende pro Eintrag neu parsen"""
+    filtered = []
+    for stat in store.iter_records():
+        try:
+            stat_time = datetime.fromisoformat(stat['timestamp']).replace(tzinfo=None)
+            include = True
+            if start_str:
+                if stat_time < datetime.fromisoformat(start_str).replace(tzinfo=None): include = False
+            if end_str:
+                if stat_time > datetime.fromisoformat(end_str).replace(tzinfo=None): include = False
+            if include:
+                filtered.append(stat)
+        except Exception:
+            continue
+    return filtered
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--dir', default='stats_bench', help='Ordner für die synthetischen Tagesdateien')
+    parser.add_argument('--reuse', action='store_true', help='Vorhandene Tagesdateien in --dir verwenden')
+    parser.add_argument('--limit', type=int, default=100, help='Seitengröße der Index-Abfragen')
+    parser.add_argument('--repeat', type=int, default=20, help='Wiederholungen pro Index-Abfrage')
+    parser.add_argument('--skip-old', action='store_true', help='Alte lineare Suche nicht messen (dauert lange)')
+    args = parser.parse_args()
+
+    if args.reuse:
+        ende = datetime.now(pytz.timezone('Europe/Berlin')).replace(microsecond=0, tzinfo=None)
+        beginn = ende - timedelta(days=args.days)
+    else:
+        start = time.perf_counter()
+        beginn, ende = generate(args.dir, args.records, args.days)
+        print(f"Erzeugt: {args.records} LKWs in {time.perf_counter() - start:.1f} s")
+
+    start = time.perf_counter()
+    store = TruckStatsStore(args.dir, retention_days=args.days + 1, legacy_file=None)
+    print(f"Index aufgebaut: {len(store.index_times)} Einträge in {time.perf_counter() - start:.1f} s, "
+          f"{sum(a.itemsize * len(a) for a in (store.index_times, store.index_days, store.index_offsets)) / 1e6:.1f} MB")
+    print()
+
+    mitte = beginn + (ende - beginn) / 2
+    zeitraeume = [('1 Stunde', timedelta(hours=1)), ('1 Tag', timedelta(days=1)),
+                  ('7 Tage', timedelta(days=7)), ('alles', ende - beginn)]
+    print(f"{'Zeitraum':<10} {'Treffer':>9} {'Zählen ms':>10} {f'Seite ({args.limit}) ms':>16} "
+          f"{'letzte Seite ms':>16} {'alt ms':>10}")
+    for name, dauer in zeitraeume:
+        von = max(mitte - dauer / 2, beginn)
+        bis = min(von + dauer, ende)
+        start_str, end_str = von.isoformat(), bis.isoformat()
+        start_s, end_s = stats_zeitpunkt(start_str), stats_zeitpunkt(end_str)
+
+        (total, _), count_ms = timed(lambda: store.query(start_s, end_s, 0, 0), args.repeat)
+        _, page_ms = timed(lambda: store.query(start_s, end_s, 0, args.limit), args.repeat)
+        _, last_ms = timed(lambda: store.query(start_s, end_s, max(total - args.limit, 0), args.limit), args.repeat)
+        old = '-'
+        if not args.skip_old:
+            old_result, old_ms = timed(lambda: old_query(store, start_str, end_str), 1)
+            if len(old_result) != total:
+                print(f"ABWEICHUNG bei {name}: alt {len(old_result)}, Index {total}")
+            old = f"{old_ms:.0f}"
+        print(f"{name:<10} {total:9d} {count_ms:10.3f} {page_ms:16.3f} {last_ms:16.3f} {old:>10}")
+
+
+if __name__ == '__main__':
+    main()
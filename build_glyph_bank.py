@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Glyphen-Bank für die eingebaute Ziffernerkennung (Stärke/Server) erstellen
+
+1. Ausschnitte aus Info-Screenshots schneiden; Tesseract schlägt die Beschriftung vor:
+    python3 build_glyph_bank.py prepare --frames info_frames/ --crops glyph_crops/
+2. glyph_crops/labels.tsv prüfen und falsche Beschriftungen korrigieren (Datei<TAB>Text)
+3. Bank bauen und an denselben Ausschnitten prüfen:
+    python3 build_glyph_bank.py build --crops glyph_crops/ --out glyph_bank.npz
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+import pytesseract
+from PIL import Image
+
+from lkw_bot_web import (GLYPH_BANK_FILE, SERVER_BOX, STAERKE_BOX, STAERKE_OCR_CONFIGS, GlyphClassifier,
+                         crop_gray, frame_crop, glyph_vector, segment_glyphs)
+
+LABELS_FILE = 'labels.tsv'
+DUPLICATE_SCORE = 0.99  # Fast identische Beispiele desselben Zeichens nur einmal speichern
+
+
+def prepare(frames_dir, crops_dir):
+    """Schneidet Stärke- und Server-Ausschnitte aus und schreibt Tesseract-Vorschläge nach labels.tsv"""
+    files = sorted(glob.glob(os.path.join(frames_dir, '*.png')))
+    if not files:
+        raise SystemExit(f"Keine PNG-Dateien in '{frames_dir}' gefunden")
+    os.makedirs(crops_dir, exist_ok=True)
+    with open(os.path.join(crops_dir, LABELS_FILE), 'a', encoding='utf-8') as labels:
+        for path in files:
+            frame = cv2.imread(path)
+            name = os.path.splitext(os.path.basename(path))[0]
+            for kind, box, config in (('staerke', STAERKE_BOX, STAERKE_OCR_CONFIGS[0]), ('server', SERVER_BOX, '')):
+                crop = frame_crop(frame, box)
+                crop_name = f"{name}_{kind}.png"
+                crop.save(os.path.join(crops_dir, crop_name))
+                guess = pytesseract.image_to_string(crop, lang='eng', config=config).strip().replace(' ', '')
+                labels.write(f"{crop_name}\t{guess}\n")
+                print(f"{crop_name}: '{guess}'")
+    print(f"Bitte {os.path.join(crops_dir, LABELS_FILE)} prüfen und korrigieren, dann 'build' ausführen.")
+
+
+def read_labels(crops_dir):
+    with open(os.path.join(crops_dir, LABELS_FILE), 'r', encoding='utf-8') as f:
+        for line in f:
+            name, _, text = line.rstrip('\n').partition('\t')
+            if name and text:
+                yield os.path.join(crops_dir, name), text.replace(' ', '')
+
+
+def build(crops_dir, out):
+    labels, vectors = [], []
+    skipped = 0
+    for path, text in read_labels(crops_dir):
+        glyphs = segment_glyphs(crop_gray(Image.open(path).convert('RGB')))
+        if len(glyphs) != len(text):
+            print(f"Übersprungen: {os.path.basename(path)} - {len(glyphs)} Zeichen gefunden, '{text}' hat {len(text)}")
+            skipped += 1
+            continue
+        for char, glyph in zip(text, glyphs):
+            vector = glyph_vector(glyph)
+            same = [v for l, v in zip(labels, vectors) if l == char]
+            if same and max(float(v @ vector) for v in same) >= DUPLICATE_SCORE:
+                continue
+            labels.append(char)
+            vectors.append(vector)
+
+    if not vectors:
+        raise SystemExit("Keine verwendbaren Ausschnitte - Bank nicht geschrieben")
+    np.savez(out, labels=np.array(labels), glyphs=np.stack(vectors).astype(np.float32))
+    counts = {char: labels.count(char) for char in sorted(set(labels))}
+    print(f"{out}: {len(labels)} Glyphen ({', '.join(f'{c}={n}' for c, n in counts.items())}), "
+          f"{skipped} Ausschnitte übersprungen")
+    return out
+
+
+def verify(crops_dir, bank_path):
+    """Liest alle beschrifteten Ausschnitte mit der Bank und vergleicht mit der Beschriftung"""
+    classifier = GlyphClassifier(bank_path)
+    correct = wrong = fallback = 0
+    total_ms = 0.0
+    for path, text in read_labels(crops_dir):
+        image = Image.open(path).convert('RGB')
+        start = time.perf_counter()
+        result = classifier.read(image)
+        total_ms += (time.perf_counter() - start) * 1000
+        if result is None:
+            fallback += 1
+        elif result == text:
+            correct += 1
+        else:
+            wrong += 1
+            print(f"Falsch: {os.path.basename(path)} '{result}' statt '{text}'")
+    total = correct + wrong + fallback
+    print(f"Prüfung: {correct}/{total} richtig, {wrong} falsch, {fallback} an Tesseract übergeben, "
+          f"{total_ms / max(total, 1):.3f} ms pro Ausschnitt")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_prepare = sub.add_parser('prepare', help='Ausschnitte aus Info-Screenshots schneiden und vorbeschriften')
+    p_prepare.add_argument('--frames', required=True, help='Ordner mit Info-Screenshots (PNG, 720x1280)')
+    p_prepare.add_argument('--crops', default='glyph_crops', help='Zielordner für Ausschnitte und labels.tsv')
+    p_build = sub.add_parser('build', help='Glyphen-Bank aus beschrifteten Ausschnitten bauen')
+    p_build.add_argument('--crops', default='glyph_crops', help='Ordner mit Ausschnitten und labels.tsv')
+    p_build.add_argument('--out', default=GLYPH_BANK_FILE)
+    args = parser.parse_args()
+
+    if args.command == 'prepare':
+        prepare(args.frames, args.crops)
+    else:
+        verify(args.crops, build(args.crops, args.out))
+
+
+if __name__ == '__main__':
+    main()
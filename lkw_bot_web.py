@@ -14,15 +14,32 @@ import pytesseract
 import os
 import re
 import threading
+import queue
 import json
+import csv
+import io
+import zlib
+import struct
+import hashlib
+import heapq
+import atexit
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict, deque, namedtuple
+from concurrent.futures import Future
 from datetime import datetime, timedelta
 from pathlib import Path  # <-- HIER IST DER FEHLENDE IMPORT VON LETZTEM MAL
 import pytz
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify
+from flask import Flask, Response, render_template, request, redirect, url_for, session, jsonify, stream_with_context
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 import logging
 
+try:
+    import tesserocr  # Optional: hält das Tesseract-Sprachmodell im Speicher (pip install tesserocr)
+except ImportError:
+    tesserocr = None
+
 # Übersetzungen (Erweitert für Zombie-Bot)
 TRANSLATIONS = {
     'de': {
@@ -159,9 +176,19 @@ logger = logging.getLogger(__name__)
 
 # LKW-Bot Dateien
 LKW_TEMPLATE_FILE = 'rentier_template.png' # Name der Template-Datei
-LKW_STAERKEN_FILE = 'lkw_staerken.txt'     # Datei für bereits geteilte Stärken
-LKW_STATS_FILE = 'truck_stats.json'        # Datei für Statistiken (ersetzt truck_data.json)
+LKW_TEMPLATE_FILES = [LKW_TEMPLATE_FILE, 'rentier_template2.png']  # Template-Bank (alle in einem Durchgang)
+LKW_STAERKEN_FILE = 'lkw_staerken.txt'     # Datei für bereits geteilte Stärken (Journal: ablauf, stärke, server)
+STAERKEN_COMPACT_INTERVAL = 300            # Sekunden zwischen zwei Kompaktierungen des Stärken-Journals
+LKW_STATS_FILE = 'truck_stats.json'        # Alte Statistik-Datei - wird beim Start nach LKW_STATS_DIR übernommen
+LKW_STATS_DIR = 'truck_stats'              # Statistik als Tagesdateien YYYY-MM-DD.jsonl (nur Anhängen)
+LKW_STATS_RETENTION_DAYS = 30              # Ältere Tagesdateien werden im Hintergrund gelöscht
+LKW_STATS_HOURLY_ROLLUP_DAYS = 90          # Stunden-Zusammenfassungen gelöschter Tage so lange behalten
+LKW_STATS_DAILY_ROLLUP_DAYS = 730          # Tages-Zusammenfassungen gelöschter Tage so lange behalten
+LKW_STATS_SERIES_HOURLY_DAYS = 7           # Zeitreihe bis zu dieser Spanne stündlich, darüber täglich
+LKW_STATS_EXPORT_CHUNK = 64 * 1024         # Bytes pro Block beim Export (/api/admin/stats/export)
+LKW_STATS_BINS = [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100]  # Stärke-Verteilung (M), letzter Eimer = 100+
 LKW_SSH_CONFIG_FILE = 'ssh_config.json'
+GLYPH_BANK_FILE = 'glyph_bank.npz'         # Gelernte Ziffern-Glyphen (erstellt mit build_glyph_bank.py)
 
 # Zombie-Bot Dateien
 GOLD_ZOMBIE_SSH_CONFIG_FILE = 'gold_zombie_ssh_config.json'
@@ -174,25 +201,1775 @@ MAINTENANCE_FILE = 'maintenance.json'
 MODE_REQUESTS_FILE = 'mode_requests.json'
 
 
-# Klick-Koordinaten (aus altem Skript)
+# Klick-Koordinaten (aus altem Skript) - (x, y, Pause danach in Sekunden)
+# Die Pause gilt, wenn der Schritt in einem Tap-Makro läuft (z.B. Teilen-Sequenz)
+# Dritter Wert: Pause nach dem Tap in Sekunden (im Makro auf dem Gerät). Die Dialoge öffnen sich
+# in unter einer Sekunde; nach ESC etwas länger, damit die Liste beim nächsten Screenshot steht.
 COORDS_NEW = {
-    'esc': (680, 70),           # ESC-Button oben rechts
-    'share': (450, 1100),       # Teilen-Button
-    'share_confirm1': (300, 450), # Bestätigung 1 - Weltchat
-    'share_confirm2': (400, 750), # Bestätigung 2 - Weltchat
+    'esc': (680, 70, 2.0),            # ESC-Button oben rechts
+    'share': (450, 1100, 2.0),        # Teilen-Button
+    'share_confirm1': (300, 450, 2.0), # Bestätigung 1 - Weltchat
+    'share_confirm2': (400, 750, 2.0), # Bestätigung 2 - Weltchat
 }
 
 # Koordinaten für Allianz-Chat (aus altem Skript)
 COORDS_ALLIANCE = {
-    'esc': (680, 70),           # ESC-Button (gleich)
-    'share': (450, 1100),       # Teilen-Button (gleich)
-    'share_confirm1': (300, 700), # Bestätigung 1 - Allianz-Chat
-    'share_confirm2': (400, 750), # Bestätigung 2 - Allianz-Chat (gleich)
+    'esc': (680, 70, 2.0),            # ESC-Button (gleich)
+    'share': (450, 1100, 2.0),        # Teilen-Button (gleich)
+    'share_confirm1': (300, 700, 2.0), # Bestätigung 1 - Allianz-Chat
+    'share_confirm2': (400, 750, 2.0), # Bestätigung 2 - Allianz-Chat (gleich)
 }
 
+# Reihenfolge der Teilen-Sequenz (Schlüssel aus COORDS_NEW / COORDS_ALLIANCE)
+SHARE_SEQUENCE = ('share', 'share_confirm1', 'share_confirm2', 'esc')
+
 # OCR-Boxen (aus altem Skript)
 STAERKE_BOX = (200, 950, 300, 1000)   # Stärke-Bereich (links, oben, rechts, unten)
 SERVER_BOX = (160, 860, 220, 915)    # Server-Bereich (links, oben, rechts, unten)
+STAERKE_OCR_CONFIGS = ('--psm 7', '--psm 8', '--psm 6')  # Rückfall, wenn die Vorverarbeitung nichts liefert
+
+# OCR-Vorverarbeitung pro Ausschnitt-Art (Stärke, Server, Zombie-Timer): Graustufen, Vergrößern,
+# adaptive Schwelle (schwarze Schrift auf weiß), Zeichen-Whitelist und Mindest-Konfidenz (0-100)
+OCR_PIPELINES = {
+    'staerke': {'upscale': 3, 'threshold': True, 'psm': 7, 'whitelist': '0123456789.,M', 'min_confidence': 60},
+    'server': {'upscale': 3, 'threshold': True, 'psm': 7, 'whitelist': '0123456789#', 'min_confidence': 60},
+    'timer': {'upscale': 2, 'threshold': True, 'psm': 6, 'whitelist': None, 'min_confidence': 0},
+}
+OCR_ADAPTIVE_BLOCK = 31         # Nachbarschaft (Pixel, ungerade) der adaptiven Schwelle nach dem Vergrößern
+OCR_ADAPTIVE_C = 10             # Abzug vom lokalen Mittelwert
+OCR_PADDING = 10                # Weißer Rand um den Ausschnitt - Tesseract erkennt Zeichen am Rand schlecht
+
+# Eigene Ziffernerkennung für Stärke/Server (Ziffern . , M #) - Tesseract nur bei unsicheren Ausschnitten
+GLYPH_SIZE = 16                 # Glyphen werden auf GLYPH_SIZE x GLYPH_SIZE normiert (Zeilenhöhe = GLYPH_SIZE)
+GLYPH_MIN_PIXELS = 2            # Kleinere Spalten-Segmente gelten als Rauschen
+GLYPH_MIN_SCORE = 0.80          # Mindest-Korrelation jedes Zeichens, sonst Tesseract
+
+# Screenshot-Modus: 'stream' = 'adb exec-out screencap -p' direkt in den Speicher (PNG),
+# 'raw' = roher RGBA-Framebuffer ohne PNG-Kodierung (mehr Bytes, aber kein Encode/Decode),
+# 'file' = alter Weg über /sdcard + adb pull (nur zum Debuggen, Dateien bleiben liegen)
+SCREENSHOT_MODE = 'stream'
+SCREENSHOT_MODES = ('stream', 'raw', 'file')
+
+# Warten auf Bildschirmänderung statt fester Pausen nach Klicks.
+# Verglichen werden stark verkleinerte Graustufen-Bilder (mittlere absolute Differenz 0-255).
+SCREEN_WAIT_TIMEOUT = 3.0       # Maximale Wartezeit nach einem Klick (Sekunden)
+SCREEN_WAIT_POLL = 0.05         # Pause zwischen zwei Vergleichs-Screenshots
+SCREEN_CHANGE_THRESHOLD = 6.0   # Ab dieser Differenz zur Referenz gilt der Bildschirm als geändert
+SCREEN_SETTLE_THRESHOLD = 1.5   # Unter dieser Differenz zweier Folgebilder gilt er als ruhig
+SCREEN_THUMB_SIZE = (45, 80)    # (Breite, Höhe) der Vergleichsbilder - 1/16 von 720x1280
+
+# Template-Matching für Rentier-LKWs
+LKW_MATCH_THRESHOLD = 0.40      # Mindest-Score (TM_CCOEFF_NORMED) für einen Treffer
+TEMPLATE_SCALES = (0.5,)        # Vorberechnete verkleinerte Template-Varianten (Graustufen)
+# Suchbereiche (x1, y1, x2, y2) - LKWs tauchen nur im Listenband zwischen Titelleiste und unterer
+# Leiste auf (720x1280). None schaltet die Eingrenzung ab (ganzer Bildschirm). Prüfen mit
+# benchmark_matching.py: die Spalte 'außerhalb ROI' muss 0 bleiben.
+LKW_SEARCH_ROIS = [(0, 140, 720, 1200)]
+# Zweistufige Pyramide: grob auf halber Auflösung in Graustufen, dann volle Auflösung nur um Kandidaten
+PYRAMID_MATCHING = True
+PYRAMID_SCALE = 0.5             # Muss in TEMPLATE_SCALES enthalten sein
+PYRAMID_MARGIN = 0.05           # Grobstufe akzeptiert schon ab LKW_MATCH_THRESHOLD - PYRAMID_MARGIN
+PYRAMID_REFINE_PADDING = 4      # Rand (Pixel, volle Auflösung) um jeden Kandidaten beim Verfeinern
+PYRAMID_MAX_WINDOW_FRACTION = 0.6  # Decken die Fenster mehr als diesen Anteil ab, wird der Bereich direkt gesucht
+# Non-Maximum-Suppression: ein Treffer pro LKW statt Dutzender überlappender Pixel
+NMS_PEAK_SIZE = 5               # Lokale Maxima der Score-Karte in diesem Fenster (Pixel)
+NMS_OVERLAP = 0.3               # Boxen mit höherer Überlappung (IoU) zum besseren Treffer werden verworfen
+SCORE_HISTOGRAM_BINS = 20       # Verteilung der Treffer-Scores (0-1) zum Einstellen von LKW_MATCH_THRESHOLD
+HANDLED_TRUCK_RADIUS = 10       # Treffer so nah an einem schon bearbeiteten (gleiche Liste) werden übersprungen
+
+# Wiedererkennung bereits bearbeiteter LKWs an ihrer Listenzeile (ohne Info-Fenster)
+LIST_ROW_OFFSET = 40            # Zeile beginnt so viele Pixel über dem Treffer ...
+LIST_ROW_HEIGHT = 120           # ... und ist so hoch (volle Bildschirmbreite)
+LIST_HASH_SIZE = (129, 16)      # (Breite, Höhe) des Differenz-Hashes - fein genug für einzelne Ziffern
+LIST_HASH_MIN_STEP = 8          # Helligkeitssprung (Graustufen) ab dem ein Bit gesetzt wird
+LIST_HASH_MAX_DISTANCE = 4      # Höchstens so viele abweichende Bits gelten als dieselbe Zeile
+
+# Hintergrund-Aufnahme (optional): Anzahl Frames im Ringpuffer und Fenster für die FPS-Anzeige
+FRAME_BUFFER_SIZE = 4
+FRAME_FPS_WINDOW = 30
+
+# Pixelformate von 'screencap' ohne -p, die als RGBA gelesen werden können
+# (1 = RGBA_8888, 2 = RGBX_8888 - der Alpha-Kanal ist dann konstant)
+RAW_PIXEL_FORMATS = (1, 2)
+
+# OCR-Dienst: langlebige Worker statt eines tesseract-Prozesses pro Aufruf
+OCR_WORKERS = 2                 # Parallele Tesseract-Instanzen (Pi 4: 4 Kerne, Rest für Bot + Web)
+OCR_LANG = 'eng'
+OCR_TIMEOUT = 30                # Sekunden, die ein Aufrufer höchstens auf ein Ergebnis wartet
+OCR_LATENCY_WINDOW = 200        # Anzahl der letzten Aufrufe für die Latenz-Statistik
+# Ergebnis-Cache: gleiche Ausschnitt-Pixel + gleiche Konfiguration = gleicher Text
+OCR_CACHE_SIZE = 1024           # Höchstzahl der Einträge (am längsten ungenutzte fliegen zuerst raus)
+OCR_CACHE_FILE = None           # z.B. 'ocr_cache.json', um den Cache über Neustarts zu behalten
+OCR_CACHE_SAVE_EVERY = 50       # Neue Einträge, nach denen der Cache gespeichert wird
+
+
+# ================== ADB Bildschirmaufnahme (Allgemeine Funktionen) ==================
+
+def adb_screencap_stream(adb_device, timeout=10):
+    """Holt einen Screenshot per 'adb exec-out' direkt als BGR-Array - ohne Temp-Dateien"""
+    result = subprocess.run(['adb', '-s', adb_device, 'exec-out', 'screencap', '-p'],
+                            capture_output=True, timeout=timeout)
+    if result.returncode != 0 or not result.stdout:
+        raise RuntimeError(f"exec-out screencap fehlgeschlagen: {result.stderr.decode(errors='ignore').strip()}")
+    frame = cv2.imdecode(np.frombuffer(result.stdout, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise RuntimeError(f"PNG-Daten konnten nicht dekodiert werden ({len(result.stdout)} Bytes)")
+    return frame
+
+def adb_screencap_raw(adb_device, timeout=10):
+    """Holt den rohen Framebuffer per 'adb exec-out screencap' (ohne -p).
+
+    Gibt eine schreibgeschützte RGBA-Sicht (H, W, 4) direkt auf den adb-Ausgabepuffer
+    zurück - es wird nichts kopiert oder dekodiert.
+    """
+    result = subprocess.run(['adb', '-s', adb_device, 'exec-out', 'screencap'],
+                            capture_output=True, timeout=timeout)
+    data = result.stdout
+    if result.returncode != 0 or len(data) < 12:
+        raise RuntimeError(f"exec-out screencap (raw) fehlgeschlagen: {result.stderr.decode(errors='ignore').strip()}")
+
+    # Header: Breite, Höhe, Pixelformat (+ Farbraum ab Android 9) als uint32 little-endian
+    width, height, pixel_format = struct.unpack_from('<III', data, 0)
+    pixel_bytes = width * height * 4
+    header_size = len(data) - pixel_bytes
+    if header_size not in (12, 16):
+        raise RuntimeError(f"Unerwartete Rohdaten-Größe: {len(data)} Bytes für {width}x{height}")
+    if pixel_format not in RAW_PIXEL_FORMATS:
+        raise RuntimeError(f"Nicht unterstütztes Pixelformat {pixel_format}")
+    return np.frombuffer(data, dtype=np.uint8, count=pixel_bytes, offset=header_size).reshape(height, width, 4)
+
+def adb_screencap_file(adb_device, local_path, remote_name, timeout=10):
+    """Debug-Modus: Screenshot auf /sdcard ablegen, per adb pull holen und von Platte lesen"""
+    subprocess.run(['adb', '-s', adb_device, 'shell', 'screencap', '-p', f'/sdcard/{remote_name}'],
+                   timeout=timeout, capture_output=True)
+    subprocess.run(['adb', '-s', adb_device, 'pull', f'/sdcard/{remote_name}', str(local_path)],
+                   timeout=timeout, capture_output=True)
+    if not os.path.exists(local_path):
+        raise RuntimeError(f"Screenshot-Datei {local_path} wurde nicht erstellt")
+    frame = cv2.imread(str(local_path))
+    if frame is None:
+        raise RuntimeError(f"Screenshot-Datei {local_path} konnte nicht gelesen werden")
+    return frame
+
+def adb_screencap(adb_device, mode, local_path=None, remote_name='screen.png'):
+    """Screenshot im gewünschten Modus; 3 Kanäle = BGR (PNG/Datei), 4 Kanäle = RGBA (raw)"""
+    if mode == 'raw':
+        return adb_screencap_raw(adb_device)
+    if mode == 'file':
+        return adb_screencap_file(adb_device, local_path or remote_name, remote_name)
+    return adb_screencap_stream(adb_device)
+
+def frame_crop(frame, box):
+    """Schneidet eine Box (links, oben, rechts, unten) aus einem Frame als PIL-Bild (RGB) aus.
+
+    Bei Roh-Frames (RGBA) wird nur der Ausschnitt konvertiert, nicht das ganze Bild.
+    """
+    x1, y1, x2, y2 = box
+    code = cv2.COLOR_RGBA2RGB if frame.shape[2] == 4 else cv2.COLOR_BGR2RGB
+    return Image.fromarray(cv2.cvtColor(frame[y1:y2, x1:x2], code))
+
+def template_for_frame(template, frame):
+    """Bringt ein BGR-Template in das Kanal-Layout des Frames, damit matchTemplate direkt auf dem Frame läuft"""
+    if frame.shape[2] == 4:
+        return cv2.cvtColor(template, cv2.COLOR_BGR2RGBA)
+    return template
+
+
+# ================== Warten auf Bildschirmänderung (Allgemeine Funktionen) ==================
+
+def frame_thumbnail(frame, region=None):
+    """Verkleinertes Graustufenbild eines Frames (oder einer Region) für schnelle Vergleiche"""
+    if region is not None:
+        x1, y1, x2, y2 = region
+        frame = frame[y1:y2, x1:x2]
+    # Erst verkleinern, dann Graustufen - so wird nur das kleine Bild konvertiert
+    small = cv2.resize(frame, SCREEN_THUMB_SIZE, interpolation=cv2.INTER_AREA)
+    code = cv2.COLOR_RGBA2GRAY if small.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(small, code)
+
+def thumbnail_difference(a, b):
+    """Mittlere absolute Differenz zweier Vergleichsbilder (0 = identisch, 255 = invertiert)"""
+    return float(cv2.absdiff(a, b).mean())
+
+def region_matches_template(frame, region, template, threshold):
+    """Prüft ob das Template (BGR) irgendwo in der Region des Frames mit mind. threshold vorkommt"""
+    x1, y1, x2, y2 = region
+    crop = frame[y1:y2, x1:x2]
+    result = cv2.matchTemplate(crop, template_for_frame(template, crop), cv2.TM_CCOEFF_NORMED)
+    return cv2.minMaxLoc(result)[1] >= threshold
+
+def wait_for_screen(capture, reference=None, region=None, template=None, template_threshold=0.8,
+                    timeout=SCREEN_WAIT_TIMEOUT):
+    """Wartet bis sich der Bildschirm geändert und beruhigt hat oder die Region zum Template passt.
+
+    capture:   Funktion die einen Frame liefert (oder None)
+    reference: Frame vor der Aktion - ohne Referenz wird nur auf Ruhe gewartet
+    region:    (x1, y1, x2, y2) - nur diesen Bereich vergleichen
+    template:  wenn gesetzt, wird gewartet bis die Region dieses Template enthält
+
+    Gibt den letzten (ruhigen bzw. passenden) Frame zurück, oder None bei Timeout.
+    """
+    deadline = time.time() + timeout
+    reference_thumb = frame_thumbnail(reference, region) if reference is not None else None
+    changed = reference_thumb is None
+    previous_thumb = None
+    while time.time() < deadline:
+        frame = capture()
+        if frame is not None:
+            if template is not None:
+                if region_matches_template(frame, region or (0, 0, frame.shape[1], frame.shape[0]),
+                                           template, template_threshold):
+                    return frame
+            else:
+                thumb = frame_thumbnail(frame, region)
+                if not changed:
+                    changed = thumbnail_difference(reference_thumb, thumb) >= SCREEN_CHANGE_THRESHOLD
+                elif previous_thumb is not None and thumbnail_difference(previous_thumb, thumb) < SCREEN_SETTLE_THRESHOLD:
+                    return frame
+                previous_thumb = thumb
+        time.sleep(SCREEN_WAIT_POLL)
+    return None
+
+
+# ================== Hintergrund-Aufnahme (Allgemeine Funktionen) ==================
+
+class FrameGrabber:
+    """Producer-Thread der laufend Screenshots in einen kleinen Ringpuffer schreibt.
+
+    Während der Bot-Thread rechnet (Template-Matching, OCR), läuft schon die nächste
+    Übertragung durch den Tunnel. Der Bot holt sich dann den neuesten Frame, dessen
+    Aufnahme nach seiner letzten Aktion begonnen hat.
+    """
+
+    def __init__(self, capture, name, size=FRAME_BUFFER_SIZE):
+        self.capture = capture
+        self.name = name
+        self.frames = deque(maxlen=size)              # (aufnahme_start, frame)
+        self.frame_times = deque(maxlen=FRAME_FPS_WINDOW)
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+        self.errors = 0
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        logger.info(f"{self.name}: Hintergrund-Aufnahme gestartet")
+
+    def stop(self):
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout=15)
+            self.thread = None
+        self.frames.clear()
+        self.frame_times.clear()
+        logger.info(f"{self.name}: Hintergrund-Aufnahme gestoppt")
+
+    def _loop(self):
+        while self.running:
+            started = time.time()
+            try:
+                frame = self.capture()
+            except Exception as e:
+                logger.warning(f"{self.name}: Hintergrund-Aufnahme fehlgeschlagen: {e}")
+                frame = None
+            if frame is None:
+                self.errors += 1
+                time.sleep(0.5)
+                continue
+            with self.condition:
+                self.frames.append((started, frame))
+                self.frame_times.append(time.time())
+                self.condition.notify_all()
+
+    def latest(self, after=0.0, timeout=SCREEN_WAIT_TIMEOUT + 5):
+        """Neuester (aufnahme_start, frame) mit Aufnahmebeginn nach 'after' - wartet notfalls bis timeout"""
+        deadline = time.time() + timeout
+        with self.condition:
+            while True:
+                if self.frames and self.frames[-1][0] > after:
+                    return self.frames[-1]
+                remaining = deadline - time.time()
+                if remaining <= 0 or not self.running:
+                    return None
+                self.condition.wait(remaining)
+
+    def fps(self):
+        """Aufnahmerate über die letzten FRAME_FPS_WINDOW Frames"""
+        with self.condition:
+            if len(self.frame_times) < 2:
+                return 0.0
+            span = self.frame_times[-1] - self.frame_times[0]
+            return (len(self.frame_times) - 1) / span if span > 0 else 0.0
+
+
+# ================== Persistente ADB-Shell (Allgemeine Funktionen) ==================
+
+class AdbShell:
+    """Langlebige 'adb shell'-Sitzung für ein Gerät.
+
+    Eingabe-Befehle (input tap/swipe) gehen über stdin in dieselbe Shell, statt für jeden
+    Klick einen neuen adb-Prozess samt Transport-Handshake durch den SSH-Tunnel zu starten.
+    Nach jedem Befehl wird ein Marker mit Exit-Code ausgegeben, damit das Ende erkannt wird.
+    Stirbt die Shell, wird sie beim nächsten Befehl automatisch neu gestartet.
+    """
+
+    MARKER = '__LKWBOT_FERTIG_'
+
+    def __init__(self, adb_device):
+        self.adb_device = adb_device
+        self.process = None
+        self.lines = None
+        self.counter = 0
+        self.respawns = 0
+        self.lock = threading.Lock()
+
+    def _spawn(self):
+        self._kill()
+        self.process = subprocess.Popen(['adb', '-s', self.adb_device, 'shell'],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.STDOUT, text=True, bufsize=1)
+        self.lines = queue.Queue()
+        threading.Thread(target=self._reader, args=(self.process, self.lines), daemon=True).start()
+        logger.info(f"ADB-Shell {self.adb_device}: Sitzung gestartet (PID {self.process.pid})")
+
+    @staticmethod
+    def _reader(process, lines):
+        for line in process.stdout:
+            lines.put(line)
+        lines.put(None)  # EOF - Shell wurde beendet
+
+    def _kill(self):
+        if self.process is None:
+            return
+        try:
+            if self.process.poll() is None:
+                self.process.kill()
+            self.process.wait(timeout=2)
+        except Exception as e:
+            logger.warning(f"ADB-Shell {self.adb_device}: Fehler beim Beenden: {e}")
+        self.process = None
+
+    def _execute(self, command, timeout):
+        self.counter += 1
+        marker = f"{self.MARKER}{self.counter}_"
+        # Nur der Schreibvorgang darf wiederholt werden - danach könnte der Befehl schon gelaufen sein
+        try:
+            self.process.stdin.write(f'{command}; echo "{marker}$?"\n')
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            return None
+
+        output = []
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            try:
+                line = self.lines.get(timeout=max(remaining, 0.001))
+            except queue.Empty:
+                raise RuntimeError(f"Timeout nach {timeout}s bei '{command}'")
+            if line is None:
+                raise RuntimeError(f"Shell während '{command}' beendet")
+            line = line.strip()
+            # Mit PTY wird die Befehlszeile selbst zurückgegeben - die enthält '$?' statt einer Zahl
+            if line.startswith(marker) and line[len(marker):].isdigit():
+                return int(line[len(marker):]), '\n'.join(output)
+            output.append(line)
+
+    def run(self, command, timeout=10):
+        """Führt einen Shell-Befehl aus und wartet auf sein Ende. Gibt (exit_code, ausgabe) zurück"""
+        with self.lock:
+            for _ in range(2):
+                if self.process is None or self.process.poll() is not None:
+                    if self.process is not None:
+                        self.respawns += 1
+                        logger.warning(f"ADB-Shell {self.adb_device}: Sitzung beendet - starte neu ({self.respawns}. Neustart)")
+                    self._spawn()
+                try:
+                    result = self._execute(command, timeout)
+                except RuntimeError:
+                    self._kill()
+                    raise
+                if result is not None:
+                    return result
+                self._kill()
+            raise RuntimeError(f"ADB-Shell {self.adb_device} nicht beschreibbar")
+
+    def close(self):
+        with self.lock:
+            self._kill()
+
+
+def build_tap_macro(steps):
+    """Baut aus [(x, y, pause_danach), ...] eine einzige Shell-Befehlszeile"""
+    parts = []
+    for x, y, delay in steps:
+        parts.append(f'input tap {x} {y}')
+        if delay > 0:
+            parts.append(f'sleep {delay:g}')
+    return '; '.join(parts)
+
+def run_tap_macro(adb_device, steps):
+    """Schickt eine ganze Tap-Sequenz samt Pausen in einem Rutsch an das Gerät"""
+    steps = list(steps)
+    timeout = sum(delay for _, _, delay in steps) + 5 * len(steps)
+    return get_adb_shell(adb_device).run(build_tap_macro(steps), timeout=timeout)
+
+
+adb_shells = {}
+adb_shells_lock = threading.Lock()
+
+def get_adb_shell(adb_device):
+    """Gibt die persistente Shell-Sitzung für ein Gerät zurück (wird bei Bedarf angelegt)"""
+    with adb_shells_lock:
+        shell = adb_shells.get(adb_device)
+        if shell is None:
+            shell = adb_shells[adb_device] = AdbShell(adb_device)
+        return shell
+
+def close_adb_shell(adb_device):
+    """Beendet die Shell-Sitzung eines Geräts, z.B. beim Trennen des Tunnels"""
+    with adb_shells_lock:
+        shell = adb_shells.pop(adb_device, None)
+    if shell:
+        shell.close()
+
+
+# ================== Template-Bank (LKW-Erkennung) ==================
+
+# Ein Treffer: linke obere Ecke des Templates, Score und Name des besten Templates an dieser Stelle
+TemplateMatch = namedtuple('TemplateMatch', ['x', 'y', 'score', 'template'])
+
+def non_max_suppression(boxes, scores, overlap=NMS_OVERLAP):
+    """Greedy-NMS über Boxen (n, 4) = x1, y1, x2, y2.
+
+    Die IoU-Matrix wird vektorisiert für alle Paare berechnet; übrig bleibt pro Gruppe
+    überlappender Boxen die mit dem höchsten Score. Gibt Indizes absteigend nach Score zurück.
+    """
+    order = np.argsort(-scores, kind='stable')
+    boxes = boxes[order].astype(np.float32)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    inter_w = np.clip(np.minimum(boxes[:, None, 2], boxes[None, :, 2]) - np.maximum(boxes[:, None, 0], boxes[None, :, 0]), 0, None)
+    inter_h = np.clip(np.minimum(boxes[:, None, 3], boxes[None, :, 3]) - np.maximum(boxes[:, None, 1], boxes[None, :, 1]), 0, None)
+    inter = inter_w * inter_h
+    iou = inter / (areas[:, None] + areas[None, :] - inter)
+
+    keep = np.ones(len(order), dtype=bool)
+    for i in range(len(order)):
+        if keep[i]:
+            keep[i + 1:] &= iou[i, i + 1:] <= overlap
+    return order[keep]
+
+class TemplateBank:
+    """Cache für die LKW-Templates.
+
+    Jedes Template wird nur einmal von Platte dekodiert und bei geänderter Datei (mtime)
+    neu geladen. Vorberechnet werden BGR-, RGBA- (für Roh-Frames) und Graustufen-Varianten
+    sowie verkleinerte Fassungen; pro Template werden Trefferstatistiken geführt.
+    """
+
+    def __init__(self, files, scales=TEMPLATE_SCALES):
+        self.files = list(files)
+        self.scales = scales
+        self.templates = {}   # Dateiname -> vorberechnete Varianten + Statistik
+        self.missing = set()
+        self.score_histogram = np.zeros(SCORE_HISTOGRAM_BINS, dtype=np.int64)
+        self.lock = threading.Lock()
+
+    def _load(self, path):
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            if path not in self.missing:
+                logger.warning(f"Template-Datei '{path}' nicht gefunden")
+                self.missing.add(path)
+            self.templates.pop(path, None)
+            return None
+        self.missing.discard(path)
+
+        entry = self.templates.get(path)
+        if entry is not None and entry['mtime'] == mtime:
+            return entry
+
+        bgr = cv2.imread(path)
+        if bgr is None:
+            logger.error(f"Template-Datei '{path}' konnte nicht gelesen werden")
+            return None
+        gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        stats = entry['stats'] if entry else {
+            'loads': 0, 'frames': 0, 'hits': 0, 'best_score': 0.0, 'last_score': 0.0, 'last_hit': None,
+        }
+        stats['loads'] += 1
+        entry = {
+            'name': path,
+            'mtime': mtime,
+            'size': (bgr.shape[1], bgr.shape[0]),
+            'bgr': bgr,
+            'rgba': cv2.cvtColor(bgr, cv2.COLOR_BGR2RGBA),
+            'gray': gray,
+            'scaled': {scale: cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                       for scale in self.scales},
+            'stats': stats,
+        }
+        self.templates[path] = entry
+        logger.info(f"Template '{path}' geladen ({entry['size'][0]}x{entry['size'][1]}, {stats['loads']}. Ladevorgang)")
+        return entry
+
+    def entries(self):
+        """Alle verfügbaren Templates (geänderte Dateien werden dabei neu geladen)"""
+        with self.lock:
+            return [entry for entry in (self._load(path) for path in self.files) if entry is not None]
+
+    def _coarse_windows(self, frame, roi, entries, threshold):
+        """Grobstufe: Graustufen-Suche auf PYRAMID_SCALE, liefert Fenster (volle Auflösung) um Kandidaten"""
+        x1, y1, x2, y2 = roi
+        crop = frame[y1:y2, x1:x2]
+        gray = cv2.cvtColor(crop, cv2.COLOR_RGBA2GRAY if crop.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(gray, None, fx=PYRAMID_SCALE, fy=PYRAMID_SCALE, interpolation=cv2.INTER_AREA)
+
+        candidates = np.zeros(small.shape, dtype=np.uint8)
+        for entry in entries:
+            template = entry['scaled'][PYRAMID_SCALE]
+            if small.shape[0] < template.shape[0] or small.shape[1] < template.shape[1]:
+                continue
+            result = cv2.matchTemplate(small, template, cv2.TM_CCOEFF_NORMED)
+            candidates[:result.shape[0], :result.shape[1]][result >= threshold - PYRAMID_MARGIN] = 1
+        if not candidates.any():
+            return []
+
+        # Kandidaten (linke obere Ecken) auf die Fläche aufblasen, die beim Verfeinern gebraucht wird:
+        # Template-Größe plus Rand. Überlappende Flächen verschmelzen so zu einem Fenster.
+        max_tw = max(entry['size'][0] for entry in entries)
+        max_th = max(entry['size'][1] for entry in entries)
+        pad = int(PYRAMID_REFINE_PADDING * PYRAMID_SCALE) + 1
+        kernel = np.ones((int(max_th * PYRAMID_SCALE) + 2 * pad, int(max_tw * PYRAMID_SCALE) + 2 * pad), dtype=np.uint8)
+        area = cv2.dilate(candidates, kernel, anchor=(kernel.shape[1] - 1 - pad, kernel.shape[0] - 1 - pad))
+        _, _, rects, _ = cv2.connectedComponentsWithStats(area, connectivity=8)
+        windows = []
+        for cx, cy, cw, ch, _ in rects[1:]:
+            windows.append((
+                x1 + int(cx / PYRAMID_SCALE),
+                y1 + int(cy / PYRAMID_SCALE),
+                min(x2, x1 + int(np.ceil((cx + cw) / PYRAMID_SCALE))),
+                min(y2, y1 + int(np.ceil((cy + ch) / PYRAMID_SCALE))),
+            ))
+        # Viele verstreute Kandidaten: Verfeinern wäre teurer als den Bereich direkt zu durchsuchen
+        window_area = sum((wx2 - wx1) * (wy2 - wy1) for wx1, wy1, wx2, wy2 in windows)
+        if window_area > PYRAMID_MAX_WINDOW_FRACTION * (x2 - x1) * (y2 - y1):
+            return [roi]
+        return windows
+
+    def match(self, frame, threshold=LKW_MATCH_THRESHOLD, rois=LKW_SEARCH_ROIS, pyramid=PYRAMID_MATCHING, nms=True):
+        """Sucht alle Templates in einem Durchgang.
+
+        rois:    Liste von Suchbereichen (x1, y1, x2, y2), None = ganzer Frame
+        pyramid: erst grob auf verkleinertem Graustufenbild suchen, dann nur um Kandidaten
+                 in voller Auflösung - dort sind die Scores identisch zur Vollbild-Suche
+        nms:     ein Treffer pro LKW, absteigend nach Score. Ohne NMS kommen wie früher
+                 alle Pixel über der Schwelle zurück (zeilenweise sortiert)
+
+        Die Score-Karten werden auf die Template-Mitte ausgerichtet und pixelweise zusammengeführt,
+        so gewinnt an jeder Stelle das Template mit dem höchsten Score.
+        Gibt eine Liste von TemplateMatch zurück, oder None ohne Templates.
+        """
+        entries = self.entries()
+        if not entries:
+            return None
+        best_score, best_index = self._score_map(frame, entries, threshold, rois, pyramid)
+        offsets = np.array([(e['size'][0] // 2, e['size'][1] // 2) for e in entries])
+        sizes = np.array([e['size'] for e in entries])
+
+        if not nms:
+            ys, xs = np.nonzero(best_score >= threshold)
+            indices = best_index[ys, xs]
+            lefts = xs - offsets[indices, 0]
+            tops = ys - offsets[indices, 1]
+            order = np.lexsort((lefts, tops))
+            return [TemplateMatch(int(lefts[i]), int(tops[i]), float(best_score[ys[i], xs[i]]), entries[indices[i]]['name'])
+                    for i in order]
+
+        # Lokale Maxima der Score-Karte (alle, auch unter der Schwelle - für die Score-Verteilung)
+        peaks = (best_score > 0) & (best_score == cv2.dilate(best_score, np.ones((NMS_PEAK_SIZE, NMS_PEAK_SIZE), np.uint8)))
+        ys, xs = np.nonzero(peaks)
+        peak_scores = best_score[ys, xs]
+        with self.lock:
+            self.score_histogram += np.histogram(peak_scores, bins=SCORE_HISTOGRAM_BINS, range=(0.0, 1.0))[0]
+
+        above = peak_scores >= threshold
+        ys, xs, peak_scores = ys[above], xs[above], peak_scores[above]
+        indices = best_index[ys, xs]
+        lefts = xs - offsets[indices, 0]
+        tops = ys - offsets[indices, 1]
+        boxes = np.stack([lefts, tops, lefts + sizes[indices, 0], tops + sizes[indices, 1]], axis=1)
+        keep = non_max_suppression(boxes, peak_scores) if len(peak_scores) else []
+
+        now = datetime.now().isoformat()
+        for i in keep:
+            stats = entries[indices[i]]['stats']
+            stats['hits'] += 1
+            stats['last_hit'] = now
+        return [TemplateMatch(int(lefts[i]), int(tops[i]), float(peak_scores[i]), entries[indices[i]]['name'])
+                for i in keep]
+
+    def _score_map(self, frame, entries, threshold, rois, pyramid):
+        """Zusammengeführte Score-Karte (Template-Mitte) und Index des besten Templates pro Pixel"""
+        height, width = frame.shape[:2]
+        best_score = np.full((height, width), -1.0, dtype=np.float32)
+        best_index = np.full((height, width), -1, dtype=np.int16)
+        max_scores = [-1.0] * len(entries)
+
+        windows = []
+        for x1, y1, x2, y2 in (rois or [(0, 0, width, height)]):
+            roi = (max(0, x1), max(0, y1), min(width, x2), min(height, y2))
+            windows.extend(self._coarse_windows(frame, roi, entries, threshold) if pyramid else [roi])
+
+        for wx1, wy1, wx2, wy2 in windows:
+            window = frame[wy1:wy2, wx1:wx2]
+            for index, entry in enumerate(entries):
+                tw, th = entry['size']
+                if window.shape[0] < th or window.shape[1] < tw:
+                    continue
+                template = entry['rgba'] if frame.shape[2] == 4 else entry['bgr']
+                result = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+                oy, ox = wy1 + th // 2, wx1 + tw // 2
+                score_view = best_score[oy:oy + result.shape[0], ox:ox + result.shape[1]]
+                index_view = best_index[oy:oy + result.shape[0], ox:ox + result.shape[1]]
+                better = result > score_view
+                score_view[better] = result[better]
+                index_view[better] = index
+                max_scores[index] = max(max_scores[index], float(result.max()))
+
+        for entry, max_score in zip(entries, max_scores):
+            stats = entry['stats']
+            stats['frames'] += 1
+            stats['last_score'] = max(max_score, 0.0)
+            stats['best_score'] = max(stats['best_score'], stats['last_score'])
+        return best_score, best_index
+
+    def stats(self):
+        """Statistik pro Template (für die Admin-API)"""
+        with self.lock:
+            return {path: dict(entry['stats'], size=entry['size']) for path, entry in self.templates.items()}
+
+    def score_distribution(self):
+        """Histogramm der Scores aller lokalen Maxima seit dem Start (zum Einstellen der Schwelle)"""
+        edges = np.linspace(0.0, 1.0, SCORE_HISTOGRAM_BINS + 1)
+        with self.lock:
+            counts = self.score_histogram.tolist()
+        return {
+            'threshold': LKW_MATCH_THRESHOLD,
+            'bins': [f"{lo:.2f}-{hi:.2f}" for lo, hi in zip(edges[:-1], edges[1:])],
+            'counts': counts,
+        }
+
+
+lkw_templates = TemplateBank(LKW_TEMPLATE_FILES)
+
+
+# ================== Listenzeilen-Hashes (Allgemeine Funktionen) ==================
+
+def list_row_box(frame, match):
+    """Box (links, oben, rechts, unten) der Listenzeile um einen Treffer, auf den Frame begrenzt"""
+    height, width = frame.shape[:2]
+    y1 = min(max(match.y - LIST_ROW_OFFSET, 0), height - 1)
+    y2 = min(y1 + LIST_ROW_HEIGHT, height)
+    return (0, y1, width, y2)
+
+def row_hash(frame, box):
+    """Differenz-Hash (dHash) einer Region als Integer.
+
+    Pro Pixel des verkleinerten Graustufenbilds zwei Bits: rechter Nachbar deutlich heller bzw.
+    deutlich dunkler. Einfarbige Flächen ergeben so stabil 0 statt Rauschen, Schrift und Kanten
+    bestimmen den Hash.
+    """
+    x1, y1, x2, y2 = box
+    small = cv2.resize(frame[y1:y2, x1:x2], LIST_HASH_SIZE, interpolation=cv2.INTER_AREA)
+    code = cv2.COLOR_RGBA2GRAY if small.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+    gray = cv2.cvtColor(small, code).astype(np.int16)
+    diff = gray[:, 1:] - gray[:, :-1]
+    bits = np.packbits(np.concatenate([(diff > LIST_HASH_MIN_STEP).ravel(), (diff < -LIST_HASH_MIN_STEP).ravel()]))
+    return int.from_bytes(bits.tobytes(), 'big')
+
+class RowHashIndex:
+    """Hashes bereits bearbeiteter Listenzeilen mit Ablaufzeit pro Eintrag"""
+
+    def __init__(self, max_distance=LIST_HASH_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.entries = {}  # Hash -> Ablaufzeitpunkt (time.time())
+        self.lock = threading.Lock()
+
+    def _evict(self, now):
+        for h in [h for h, ablauf in self.entries.items() if ablauf <= now]:
+            del self.entries[h]
+
+    def add(self, h, ttl):
+        now = time.time()
+        with self.lock:
+            self._evict(now)
+            self.entries[h] = now + ttl
+
+    def contains(self, h):
+        """True wenn ein nicht abgelaufener Eintrag höchstens max_distance Bits abweicht"""
+        with self.lock:
+            self._evict(time.time())
+            if h in self.entries:
+                return True
+            return any(bin(h ^ other).count('1') <= self.max_distance for other in self.entries)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        with self.lock:
+            self._evict(time.time())
+            return len(self.entries)
+
+
+# ================== Geteilte Stärken (Allgemeine Funktionen) ==================
+
+def staerke_schluessel(wert, server=None):
+    """Normalisierter Schlüssel aus Stärke (Float, Mio.) und Server - '12,5M' und '12.5 M' sind gleich.
+
+    Ohne Server (Server-Filter aus, alte Einträge) zählt nur die Stärke.
+    """
+    return f"{wert:g}" if server is None else f"{wert:g}@{server}"
+
+class SeenStrengthSet:
+    """Bereits geteilte Stärken im Speicher, jeder Eintrag mit eigener Ablaufzeit.
+
+    Neue Einträge werden nur angehängt (eine Zeile 'ablauf<TAB>schlüssel' pro Eintrag),
+    compact() schreibt die Datei ohne abgelaufene Einträge neu. Nachschlagen liest nie von Platte.
+    Beim Laden wird die Datei nur gelesen - neu geschrieben wird sie allein von compact()
+    (compact_timer des laufenden Bots), nicht schon beim Import. Zeilen im alten Format (nur der
+    OCR-Text der Stärke, z.B. '/ 58,6M') werden als Schlüssel ohne Server mit legacy_ttl übernommen
+    und landen beim nächsten compact() im neuen Format.
+    """
+
+    def __init__(self, path, legacy_ttl=15 * 60):
+        self.path = path
+        self.legacy_ttl = legacy_ttl
+        self.entries = {}  # Schlüssel -> Ablaufzeitpunkt (time.time())
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        now = time.time()
+        migriert = 0
+        try:
+            with open(self.path, 'r', encoding="utf-8") as f:
+                for line in f:
+                    ablauf, tab, schluessel = line.rstrip('\r\n').partition('\t')
+                    try:
+                        ablauf = float(ablauf)
+                    except ValueError:
+                        ablauf = None
+                    if ablauf is None or not tab:
+                        # Altes Format ohne Ablaufzeit: Stärke normalisieren, Server ist unbekannt
+                        wert = staerke_float_wert(line)
+                        if wert is not None:
+                            self.entries[staerke_schluessel(wert)] = now + self.legacy_ttl
+                            migriert += 1
+                    elif schluessel and ablauf > now:
+                        self.entries[schluessel] = ablauf
+        except Exception as e:
+            logger.error(f"LKW-Bot: Fehler beim Laden der Stärken: {e}")
+        if migriert:
+            logger.info(f"LKW-Bot: {migriert} Stärken im alten Format übernommen (ohne Server)")
+
+    def __contains__(self, schluessel):
+        with self.lock:
+            ablauf = self.entries.get(schluessel)
+            if ablauf is None:
+                return False
+            if ablauf <= time.time():
+                del self.entries[schluessel]
+                return False
+            return True
+
+    def enthaelt_wert(self, wert):
+        """True, wenn die Stärke ohne oder mit beliebigem Server notiert ist (Server-Filter aus)"""
+        ohne_server = staerke_schluessel(wert)
+        now = time.time()
+        with self.lock:
+            return any(ablauf > now and (schluessel == ohne_server or schluessel.startswith(ohne_server + '@'))
+                       for schluessel, ablauf in self.entries.items())
+
+    def add(self, schluessel, ttl):
+        ablauf = time.time() + ttl
+        with self.lock:
+            self.entries[schluessel] = ablauf
+            try:
+                with open(self.path, 'a', encoding="utf-8") as f:
+                    f.write(f"{ablauf:.0f}\t{schluessel}\n")
+            except Exception as e:
+                logger.error(f"LKW-Bot: Fehler beim Notieren der Stärke: {e}")
+
+    def compact(self):
+        """Entfernt abgelaufene Einträge aus Speicher und Datei"""
+        now = time.time()
+        with self.lock:
+            self.entries = {k: ablauf for k, ablauf in self.entries.items() if ablauf > now}
+            tmp_path = self.path + '.tmp'
+            try:
+                with open(tmp_path, 'w', encoding="utf-8") as f:
+                    for schluessel, ablauf in self.entries.items():
+                        f.write(f"{ablauf:.0f}\t{schluessel}\n")
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.error(f"LKW-Bot: Fehler beim Kompaktieren der Stärken: {e}")
+            return len(self.entries)
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+
+# ================== OCR-Dienst (Allgemeine Funktionen) ==================
+
+OcrResult = namedtuple('OcrResult', ['text', 'confidence'])
+
+class OcrCache:
+    """LRU-Cache für OCR-Ergebnisse, Schlüssel = Hash der Ausschnitt-Pixel und der Konfiguration"""
+
+    def __init__(self, size=OCR_CACHE_SIZE, path=OCR_CACHE_FILE):
+        self.size = size
+        self.path = path
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.unsaved = 0
+        if path:
+            self.load()
+            atexit.register(self.save)
+
+    @staticmethod
+    def key(image, config):
+        digest = hashlib.blake2b(image.tobytes(), digest_size=16)
+        digest.update(f"{image.mode}{image.size}{config}".encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+    def put(self, key, text):
+        with self.lock:
+            self.entries[key] = text
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+            self.unsaved += 1
+            speichern = self.path and self.unsaved >= OCR_CACHE_SAVE_EVERY
+        if speichern:
+            self.save()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding="utf-8") as f:
+                entries = json.load(f)
+            with self.lock:
+                self.entries = OrderedDict(list(entries.items())[-self.size:])
+            logger.info(f"OCR: {len(self.entries)} Cache-Einträge aus {self.path} geladen")
+        except Exception as e:
+            logger.error(f"OCR: Cache {self.path} konnte nicht geladen werden: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            entries = dict(self.entries)
+            self.unsaved = 0
+        try:
+            with open(self.path + '.tmp', 'w', encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(self.path + '.tmp', self.path)
+        except Exception as e:
+            logger.error(f"OCR: Cache konnte nicht gespeichert werden: {e}")
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'size': self.size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'persistent': bool(self.path),
+            }
+
+class OcrService:
+    """Langlebige OCR-Worker, die Bildausschnitte über eine Queue bekommen.
+
+    Mit tesserocr hält jeder Worker eine eigene Tesseract-Instanz mit geladenem Sprachmodell.
+    Ohne tesserocr laufen die Aufrufe über pytesseract (ein Prozess pro Aufruf), aber trotzdem
+    über dieselbe Queue und mit denselben Messwerten. Die Worker starten beim ersten Aufruf.
+    Vor der Queue sitzt ein OcrCache - schon gelesene Ausschnitte kosten nur einen Hash.
+    """
+
+    def __init__(self, workers=OCR_WORKERS, lang=OCR_LANG, cache=None):
+        self.workers = workers
+        self.lang = lang
+        self.cache = cache if cache is not None else OcrCache()
+        self.engine = 'tesserocr' if tesserocr is not None else 'pytesseract'
+        self.jobs = queue.Queue()
+        self.threads = []
+        self.lock = threading.Lock()
+        self.startup_ms = []
+        self.latencies_ms = deque(maxlen=OCR_LATENCY_WINDOW)  # ab submit, inkl. Wartezeit in der Queue
+        self.waits_ms = deque(maxlen=OCR_LATENCY_WINDOW)
+        self.calls = 0
+        self.errors = 0
+
+    def _ensure_started(self):
+        with self.lock:
+            if self.threads:
+                return
+            if tesserocr is None:
+                logger.warning("OCR: tesserocr nicht installiert - langsamer Modus, jeder Aufruf startet einen "
+                               "tesseract-Prozess (pip3 install tesserocr, siehe README)")
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"ocr-{i}", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def _worker(self):
+        start = time.perf_counter()
+        api = None
+        if tesserocr is not None:
+            try:
+                api = tesserocr.PyTessBaseAPI(lang=self.lang)
+            except Exception as e:
+                logger.error(f"OCR: tesserocr konnte nicht gestartet werden, nutze pytesseract: {e}")
+                self.engine = 'pytesseract'
+        startup_ms = (time.perf_counter() - start) * 1000
+        with self.lock:
+            self.startup_ms.append(startup_ms)
+        logger.info(f"OCR: Worker {threading.current_thread().name} bereit ({self.engine}, {startup_ms:.0f} ms)")
+
+        while True:
+            image, config, confidence, key, future, submitted = self.jobs.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            wait_ms = (time.perf_counter() - submitted) * 1000
+            try:
+                if api is not None:
+                    text, conf = self._tesserocr_text(api, image, config)
+                elif confidence:
+                    text, conf = self._pytesseract_data(image, self.lang, config)
+                else:
+                    text, conf = pytesseract.image_to_string(image, lang=self.lang, config=config), None
+                result = OcrResult(text, conf) if confidence else text
+                self.cache.put(key, result)
+                future.set_result(result)
+                failed = False
+            except Exception as e:
+                future.set_exception(e)
+                failed = True
+            with self.lock:
+                self.calls += 1
+                self.errors += failed
+                self.waits_ms.append(wait_ms)
+                self.latencies_ms.append((time.perf_counter() - submitted) * 1000)
+
+    @staticmethod
+    def _tesserocr_text(api, image, config):
+        """Wendet eine pytesseract-Konfiguration ('--psm N', '-c name=wert') auf die Instanz an"""
+        psm = tesserocr.PSM.AUTO  # Voreinstellung von tesseract/pytesseract
+        variables = {}
+        tokens = config.split()
+        for option, value in zip(tokens, tokens[1:]):
+            if option == '--psm':
+                psm = int(value)
+            elif option == '-c':
+                name, _, wert = value.partition('=')
+                variables[name] = wert
+
+        previous = {name: api.GetVariableAsString(name) for name in variables}
+        try:
+            for name, wert in variables.items():
+                api.SetVariable(name, wert)
+            api.SetPageSegMode(psm)
+            api.SetImage(image)
+            return api.GetUTF8Text(), api.MeanTextConf()
+        finally:
+            for name, wert in previous.items():
+                api.SetVariable(name, wert or '')
+
+    @staticmethod
+    def _pytesseract_data(image, lang, config):
+        """Text und mittlere Wort-Konfidenz (0-100) in einem Tesseract-Aufruf"""
+        data = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+        words = [(word, float(conf)) for word, conf in zip(data['text'], data['conf'])
+                 if word.strip() and float(conf) >= 0]
+        if not words:
+            return '', 0.0
+        return ' '.join(word for word, _ in words), sum(conf for _, conf in words) / len(words)
+
+    def submit(self, image, config='', confidence=False):
+        """Stellt einen Ausschnitt (PIL-Bild) in die Queue und gibt ein Future für den Text zurück.
+
+        Mit confidence=True liefert das Future ein OcrResult (Text, mittlere Konfidenz 0-100).
+        """
+        submitted = time.perf_counter()
+        future = Future()
+        key = self.cache.key(image, f"{config}|conf" if confidence else config)
+        cached = self.cache.get(key)
+        if cached is not None:
+            future.set_result(OcrResult(*cached) if confidence else cached)
+            return future
+        self._ensure_started()
+        self.jobs.put((image, config, confidence, key, future, submitted))
+        return future
+
+    def image_to_string(self, image, config='', timeout=OCR_TIMEOUT):
+        """Blockierender Ersatz für pytesseract.image_to_string"""
+        return self.submit(image, config).result(timeout)
+
+    def metrics(self):
+        with self.lock:
+            latencies = sorted(self.latencies_ms)
+            waits = list(self.waits_ms)
+            startup = list(self.startup_ms)
+            calls, errors = self.calls, self.errors
+        return {
+            'engine': self.engine,
+            'workers': self.workers,
+            'workers_ready': len(startup),
+            'startup_ms': round(max(startup), 1) if startup else None,
+            'calls': calls,
+            'errors': errors,
+            'queued': self.jobs.qsize(),
+            'mean_ms': round(sum(latencies) / len(latencies), 1) if latencies else None,
+            'p95_ms': round(latencies[int(len(latencies) * 0.95)], 1) if latencies else None,
+            'max_ms': round(latencies[-1], 1) if latencies else None,
+            'wait_mean_ms': round(sum(waits) / len(waits), 1) if waits else None,
+            'cache': self.cache.stats(),
+        }
+
+
+ocr_service = OcrService()
+
+
+# ================== OCR-Vorverarbeitung (Allgemeine Funktionen) ==================
+
+def crop_gray(image):
+    """PIL-Ausschnitt (RGB oder L) als Graustufen-Array"""
+    pixels = np.asarray(image)
+    return cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY) if pixels.ndim == 3 else pixels
+
+def helle_schrift(gray):
+    """True, wenn der Ausschnitt helle Schrift auf dunklem Grund zeigt.
+
+    Der Rand ist fast nur Hintergrund, die Mitte enthält die Schrift: ist die Mitte im Schnitt
+    heller als der Rand, ist die Schrift heller als der Hintergrund.
+    """
+    h, w = gray.shape[:2]
+    if h < 3 or w < 3:
+        return False
+    rand = np.concatenate([gray[0, :], gray[-1, :], gray[1:-1, 0], gray[1:-1, -1]])
+    mitte = gray[h // 4:h - h // 4, w // 4:w - w // 4]
+    return float(mitte.mean()) > float(np.median(rand))
+
+def preprocess_crop(image, pipeline):
+    """Bereitet einen Ausschnitt (PIL-Bild) nach einer OCR_PIPELINES-Definition für Tesseract auf"""
+    gray = crop_gray(image)
+    invertieren = helle_schrift(gray)  # Polarität vor der Schwelle bestimmen - danach ist alles fast weiß
+    upscale = pipeline.get('upscale', 1)
+    if upscale > 1:
+        gray = cv2.resize(gray, None, fx=upscale, fy=upscale, interpolation=cv2.INTER_CUBIC)
+    if pipeline.get('threshold'):
+        # Helle Schrift auf dunklem Grund -> über THRESH_BINARY_INV direkt schwarz auf weiß
+        gray = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                     cv2.THRESH_BINARY_INV if invertieren else cv2.THRESH_BINARY,
+                                     OCR_ADAPTIVE_BLOCK, -OCR_ADAPTIVE_C if invertieren else OCR_ADAPTIVE_C)
+    elif invertieren:
+        gray = 255 - gray
+    gray = cv2.copyMakeBorder(gray, OCR_PADDING, OCR_PADDING, OCR_PADDING, OCR_PADDING,
+                              cv2.BORDER_CONSTANT, value=255)
+    return Image.fromarray(gray)
+
+def pipeline_config(pipeline):
+    config = f"--psm {pipeline['psm']}"
+    if pipeline.get('whitelist'):
+        config += f" -c tessedit_char_whitelist={pipeline['whitelist']}"
+    return config
+
+def submit_pipeline(image, name):
+    """Liest einen Ausschnitt mit der Vorverarbeitung OCR_PIPELINES[name]; Future liefert ein OcrResult"""
+    pipeline = OCR_PIPELINES[name]
+    return ocr_service.submit(preprocess_crop(image, pipeline), pipeline_config(pipeline), confidence=True)
+
+def pipeline_result_ok(result, name):
+    return bool(result.text.strip()) and result.confidence >= OCR_PIPELINES[name]['min_confidence']
+
+
+# ================== Ziffernerkennung (Allgemeine Funktionen) ==================
+
+def segment_glyphs(gray):
+    """Zerlegt einen Graustufen-Ausschnitt in Zeichen (Binärbilder, alle mit derselben Zeilenhöhe).
+
+    Schrift ist der kleinere Anteil der Pixel (Otsu-Schwelle), Zeichen werden an leeren
+    Spalten getrennt. Oben und unten wird auf die gemeinsame Zeile zugeschnitten, damit
+    '.' und ',' ihre Lage zur Grundlinie behalten.
+    """
+    _, binary = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    if binary.mean() > 0.5:
+        binary = 1 - binary
+    rows = np.flatnonzero(binary.any(axis=1))
+    if not rows.size:
+        return []
+    line = binary[rows[0]:rows[-1] + 1]
+    edges = np.diff(np.concatenate(([0], line.any(axis=0).astype(np.int8), [0])))
+    return [line[:, a:b] for a, b in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))
+            if line[:, a:b].sum() >= GLYPH_MIN_PIXELS]
+
+def glyph_vector(glyph):
+    """Normiert ein Zeichen auf GLYPH_SIZE² (Seitenverhältnis bleibt) als Vektor mit Mittelwert 0 und Länge 1"""
+    height, width = glyph.shape
+    scale = GLYPH_SIZE / height
+    new_width = max(1, min(GLYPH_SIZE, int(round(width * scale))))
+    canvas = np.zeros((GLYPH_SIZE, GLYPH_SIZE), np.float32)
+    left = (GLYPH_SIZE - new_width) // 2
+    canvas[:, left:left + new_width] = cv2.resize(glyph.astype(np.float32), (new_width, GLYPH_SIZE),
+                                                  interpolation=cv2.INTER_AREA)
+    vector = canvas.ravel() - canvas.mean()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class GlyphClassifier:
+    """Liest Stärke- und Server-Ausschnitte per normierter Kreuzkorrelation gegen eine Glyphen-Bank.
+
+    Die Bank (GLYPH_BANK_FILE) enthält pro Beispiel-Zeichen einen normierten Vektor; alle
+    Zeichen eines Ausschnitts werden in einer Matrixmultiplikation verglichen. Ist ein
+    Zeichen unsicher oder fehlt die Bank, liefert read() None und Tesseract übernimmt.
+    """
+
+    def __init__(self, path=GLYPH_BANK_FILE, min_score=GLYPH_MIN_SCORE):
+        self.path = path
+        self.min_score = min_score
+        self.labels = None
+        self.bank = None
+        self.mtime = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.fallbacks = 0
+        self.total_ms = 0.0
+
+    def _reload(self):
+        """Lädt die Bank neu, wenn sich die Datei geändert hat (oder entfernt sie). path=None = abgeschaltet"""
+        try:
+            mtime = os.path.getmtime(self.path) if self.path else None
+        except OSError:
+            mtime = None
+        if mtime is None:
+            self.labels = self.bank = self.mtime = None
+            return
+        if mtime == self.mtime:
+            return
+        try:
+            with np.load(self.path) as data:
+                self.labels = data['labels']
+                self.bank = data['glyphs'].astype(np.float32)
+            self.mtime = mtime
+            logger.info(f"OCR: Glyphen-Bank geladen ({len(self.labels)} Beispiele, "
+                        f"Zeichen: {''.join(sorted(set(self.labels)))})")
+        except Exception as e:
+            logger.error(f"OCR: Glyphen-Bank {self.path} konnte nicht geladen werden: {e}")
+            self.labels = self.bank = None
+            self.mtime = mtime
+
+    def read(self, image):
+        """Text eines Ausschnitts (PIL-Bild) oder None, wenn Tesseract übernehmen soll"""
+        start = time.perf_counter()
+        with self.lock:
+            self._reload()
+            bank, labels = self.bank, self.labels
+        if bank is None:
+            return None
+
+        text = None
+        glyphs = segment_glyphs(crop_gray(image))
+        if glyphs:
+            scores = np.stack([glyph_vector(g) for g in glyphs]) @ bank.T
+            best = scores.argmax(axis=1)
+            if scores[np.arange(len(best)), best].min() >= self.min_score:
+                text = ''.join(labels[best])
+
+        with self.lock:
+            if text is None:
+                self.fallbacks += 1
+            else:
+                self.hits += 1
+            self.total_ms += (time.perf_counter() - start) * 1000
+        return text
+
+    def stats(self):
+        with self.lock:
+            calls = self.hits + self.fallbacks
+            return {
+                'bank': self.path if self.bank is not None else None,
+                'samples': len(self.labels) if self.labels is not None else 0,
+                'hits': self.hits,
+                'fallbacks': self.fallbacks,
+                'mean_ms': round(self.total_ms / calls, 3) if calls else None,
+            }
+
+
+glyph_classifier = GlyphClassifier()
+
+
+# ================== Info-Fenster auslesen (Allgemeine Funktionen) ==================
+
+def staerke_float_wert(staerke_text):
+    match = re.search(r"([\d\.,]+)\s*[mM]", staerke_text)
+    if match:
+        try:
+            zahl_str = match.group(1).replace(',', '.')
+            zahl = float(zahl_str)
+            # Komma-Korrektur: nur noch nötig, wenn Tesseract das Komma verschluckt hat
+            if zahl >= 100 and '.' not in match.group(1) and ',' not in match.group(1):
+                zahl = zahl / 10
+                logger.info(f"LKW-Bot: Komma-Korrektur: {match.group(1)}M → {zahl}M")
+            return zahl
+        except ValueError:
+            return None
+    return None
+
+class InfoPanelReading:
+    """Einmal ausgelesenes Info-Fenster eines LKWs.
+
+    Stärke und Server werden zuerst mit der Glyphen-Bank gelesen; was unsicher bleibt, geht
+    beim Anlegen gleichzeitig (vorverarbeitet) an den OCR-Dienst. Erst wenn dieser erste Durchgang
+    nichts Brauchbares liefert, folgen die alten Tesseract-Varianten. Text und geparste Werte werden
+    beim ersten Zugriff abgeholt und gemerkt - Filter, Duplikat-Prüfung und Statistik lesen
+    dieselben Ergebnisse.
+    """
+
+    _OFFEN = object()
+
+    def __init__(self, frame):
+        self.staerke_img = frame_crop(frame, STAERKE_BOX)
+        server_img = frame_crop(frame, SERVER_BOX)
+        self.server_img = server_img
+        self._wert = self._OFFEN
+        self._staerke_job = self._server_job = None
+        self.ocr_calls = 0            # Tesseract-Aufträge für dieses Info-Fenster
+        self.first_pass = True        # False sobald ein Rückfall-Durchgang nötig war
+
+        self._staerke = glyph_classifier.read(self.staerke_img)
+        if self._staerke and 'm' in self._staerke.lower():
+            logger.info(f"LKW-Bot: Glyphen Stärke: {self._staerke}")
+        else:
+            self._staerke = self._OFFEN
+            self._staerke_job = submit_pipeline(self.staerke_img, 'staerke')
+            self.ocr_calls += 1
+
+        # Wie bei der Stärke: nur plausible Glyphen-Ergebnisse ('#49' oder '49') übernehmen, sonst OCR
+        self._server_text = glyph_classifier.read(server_img)
+        if self._server_text and self._server_text.lstrip('#').isdigit():
+            logger.info(f"LKW-Bot: Glyphen Server: '{self._server_text}'")
+        else:
+            if self._server_text:
+                logger.info(f"LKW-Bot: Glyphen Server '{self._server_text}' unplausibel - nutze OCR")
+            self._server_text = self._OFFEN
+            self._server_job = submit_pipeline(server_img, 'server')
+            self.ocr_calls += 1
+
+    @property
+    def staerke(self):
+        """Stärke-Text wie von Tesseract erkannt ('' wenn keine Stärke gefunden)"""
+        if self._staerke is self._OFFEN:
+            self._staerke = ""
+            try:
+                result = self._staerke_job.result(OCR_TIMEOUT)
+                if pipeline_result_ok(result, 'staerke') and 'm' in result.text.lower():
+                    self._staerke = result.text.strip()
+                    logger.info(f"LKW-Bot: OCR Stärke: {self._staerke} (Konfidenz {result.confidence:.0f})")
+                else:
+                    self.first_pass = False
+                    for config in STAERKE_OCR_CONFIGS:
+                        self.ocr_calls += 1
+                        wert = ocr_service.image_to_string(self.staerke_img, config=config).strip()
+                        if wert and 'm' in wert.lower():
+                            logger.info(f"LKW-Bot: OCR Stärke: {wert}")
+                            self._staerke = wert
+                            break
+                    else:
+                        logger.warning("LKW-Bot: OCR konnte keine Stärke finden")
+            except Exception as e:
+                logger.error(f"LKW-Bot: OCR-Fehler: {e}")
+        return self._staerke
+
+    @property
+    def wert(self):
+        """Stärke in Millionen als Float (None wenn nicht lesbar)"""
+        if self._wert is self._OFFEN:
+            self._wert = staerke_float_wert(self.staerke)
+        return self._wert
+
+    @property
+    def server_text(self):
+        if self._server_text is self._OFFEN:
+            try:
+                result = self._server_job.result(OCR_TIMEOUT)
+                if pipeline_result_ok(result, 'server') and re.search(r'\d', result.text):
+                    self._server_text = result.text.strip()
+                else:
+                    self.first_pass = False
+                    self.ocr_calls += 1
+                    self._server_text = ocr_service.image_to_string(self.server_img).strip()
+                logger.info(f"LKW-Bot: OCR Server: '{self._server_text}'")
+            except Exception as e:
+                logger.error(f"LKW-Bot: Server-OCR-Fehler: {e}")
+                self._server_text = None
+        return self._server_text
+
+    @property
+    def server(self):
+        """Nur die Ziffern der Servernummer (oder 'Unknown')"""
+        s_txt = re.sub(r'[^0-9]', '', self.server_text or '')
+        return s_txt if s_txt else "Unknown"
+
+    def server_passt(self, server_number):
+        if self.server_text is None:
+            return False
+        s_txt = self.server_text.replace(' ', '').replace('O', '0')
+        return (f"#{server_number}" in s_txt) or (server_number in s_txt)
+
+
+# ================== LKW-Statistik (Allgemeine Funktionen) ==================
+
+def statistik_staerke(staerke):
+    """Zahlenwert einer gespeicherten Stärke ('12,5M' -> 12.5) - wie bisher im Dashboard gerechnet"""
+    match = re.match(r'\s*(\d+(?:\.\d+)?)', str(staerke).replace(',', '.'))
+    return float(match.group(1)) if match else None
+
+
+STATS_EPOCH = datetime(1970, 1, 1)
+MIKROSEKUNDE = timedelta(microseconds=1)
+
+def stats_zeitpunkt(zeit):
+    """Mikrosekunden seit 1970 auf der Berliner Wanduhr ('2024-05-01T12:00:00+02:00' und '2024-05-01T12:00:00'
+    ergeben denselben Wert) - so vergleicht /api/admin/stats seit jeher Zeitraum und Einträge.
+    Ganzzahlig, aber ohne Rundung: 23:59:59.5 liegt hinter end=23:59:59 wie beim alten Vergleich."""
+    return (datetime.fromisoformat(zeit).replace(tzinfo=None) - STATS_EPOCH) // MIKROSEKUNDE
+
+def stats_tag(zeitpunkt):
+    """Tag (YYYY-MM-DD) zu einem stats_zeitpunkt()"""
+    return (STATS_EPOCH + zeitpunkt * MIKROSEKUNDE).strftime('%Y-%m-%d')
+
+
+class StatsRollup:
+    """Zusammenfassung aller LKWs einer Stunde: Anzahl, Stärke-Verteilung, Server und User"""
+
+    def __init__(self):
+        self.count = 0
+        self.strength_count = 0
+        self.strength_sum = 0.0
+        self.strength_min = None
+        self.strength_max = None
+        self.buckets = [0] * len(LKW_STATS_BINS)
+        self.servers = Counter()
+        self.users = Counter()
+
+    def add(self, record):
+        self.count += 1
+        self.servers[str(record.get('server'))] += 1
+        self.users[record.get('user') or '-'] += 1
+        wert = statistik_staerke(record.get('strength', ''))
+        if wert is None:
+            return
+        self.strength_count += 1
+        self.strength_sum += wert
+        self.strength_min = wert if self.strength_min is None else min(self.strength_min, wert)
+        self.strength_max = wert if self.strength_max is None else max(self.strength_max, wert)
+        self.buckets[max(bisect_right(LKW_STATS_BINS, wert) - 1, 0)] += 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.strength_count += other.strength_count
+        self.strength_sum += other.strength_sum
+        if other.strength_min is not None:
+            self.strength_min = other.strength_min if self.strength_min is None else min(self.strength_min, other.strength_min)
+            self.strength_max = other.strength_max if self.strength_max is None else max(self.strength_max, other.strength_max)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.servers.update(other.servers)
+        self.users.update(other.users)
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'avg_strength': round(self.strength_sum / self.strength_count, 2) if self.strength_count else None,
+            'min_strength': self.strength_min,
+            'max_strength': self.strength_max,
+        }
+
+    def to_dict(self):
+        return {'count': self.count, 'strength_count': self.strength_count, 'strength_sum': self.strength_sum,
+                'strength_min': self.strength_min, 'strength_max': self.strength_max, 'buckets': self.buckets,
+                'servers': dict(self.servers), 'users': dict(self.users)}
+
+    @classmethod
+    def from_dict(cls, data):
+        rollup = cls()
+        for feld in ('count', 'strength_count', 'strength_sum', 'strength_min', 'strength_max'):
+            setattr(rollup, feld, data[feld])
+        rollup.buckets = (list(data['buckets']) + [0] * len(LKW_STATS_BINS))[:len(LKW_STATS_BINS)]
+        rollup.servers = Counter(data['servers'])
+        rollup.users = Counter(data['users'])
+        return rollup
+
+
+class TruckStatsStore:
+    """LKW-Statistik als Tagesdateien (JSONL, eine Zeile pro geteiltem LKW).
+
+    Neue Einträge werden nur angehängt. Der Dateiname (YYYY-MM-DD.jsonl, Berliner Datum) ist der
+    Zeitindex; Tage älter als retention_days werden im Hintergrund als ganze Datei gelöscht.
+    Im Speicher liegt nur ein sortierter Index (Zeit in Mikrosekunden, Tag, Byte-Position) in kompakten
+    Arrays - eine Zeitraum-Abfrage ist damit eine Binärsuche plus ein Ausschnitt.
+    Bevor ein Tag gelöscht wird, wandern seine Stunden- und Tages-Zusammenfassungen in
+    rollups_hourly.jsonl / rollups_daily.jsonl - Langzeit-Trends bleiben ohne Rohdaten abfragbar.
+    """
+
+    DAY_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}\.jsonl$')
+
+    def __init__(self, directory=LKW_STATS_DIR, retention_days=LKW_STATS_RETENTION_DAYS, legacy_file=LKW_STATS_FILE,
+                 hourly_rollup_days=LKW_STATS_HOURLY_ROLLUP_DAYS, daily_rollup_days=LKW_STATS_DAILY_ROLLUP_DAYS):
+        self.directory = Path(directory)
+        self.directory.mkdir(exist_ok=True)
+        self.retention_days = retention_days
+        self.hourly_rollup_days = hourly_rollup_days
+        self.daily_rollup_days = daily_rollup_days
+        self.hourly_path = self.directory / 'rollups_hourly.jsonl'
+        self.daily_path = self.directory / 'rollups_daily.jsonl'
+        self.archive_hourly = self._load_archive(self.hourly_path)  # 'YYYY-MM-DDTHH' -> StatsRollup gelöschter Tage
+        self.archive_daily = self._load_archive(self.daily_path)    # 'YYYY-MM-DD' -> StatsRollup gelöschter Tage
+        self.lock = threading.Lock()
+        self.current_day = None
+        self.rollups = {}  # 'YYYY-MM-DDTHH' -> StatsRollup, wird bei jedem append mitgeführt
+        self.index_times = array('q')    # stats_zeitpunkt() je Eintrag (Mikrosekunden), aufsteigend
+        self.index_days = array('l')     # Tag des Eintrags als date.toordinal()
+        self.index_offsets = array('q')  # Byte-Position der Zeile in der Tagesdatei
+        self.drop_lock = threading.Lock()  # Nur ein drop_expired gleichzeitig
+        migriert = self._migrate(legacy_file)
+        self._rebuild()
+        if migriert:
+            self.drop_expired()
+
+    def segment_path(self, day):
+        return self.directory / f"{day}.jsonl"
+
+    def days(self):
+        """Alle vorhandenen Tage (YYYY-MM-DD), aufsteigend"""
+        return sorted(name[:-6] for name in os.listdir(self.directory) if self.DAY_PATTERN.match(name))
+
+    def append(self, record):
+        day = record['timestamp'][:10]
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        with self.lock:
+            with open(self.segment_path(day), 'ab') as f:
+                offset = f.tell()
+                f.write(line)
+            self._index_add(record, day, offset)
+            neuer_tag = day != self.current_day
+            self.current_day = day
+        if neuer_tag:
+            threading.Thread(target=self.drop_expired, daemon=True).start()
+
+    def drop_expired(self):
+        """Löscht Tagesdateien, die vollständig älter als retention_days sind - ihre Zusammenfassungen bleiben"""
+        with self.drop_lock:
+            self._drop_expired()
+        self.prune_archive()
+
+    def cutoff_day(self):
+        """Erster Tag (YYYY-MM-DD), dessen Rohdaten noch behalten werden"""
+        tz = pytz.timezone('Europe/Berlin')
+        return (datetime.now(tz) - timedelta(days=self.retention_days)).date().isoformat()
+
+    def _drop_expired(self):
+        cutoff = self.cutoff_day()
+        for day in self.days():
+            if day >= cutoff:
+                break
+            try:
+                with self.lock:
+                    stunden = {k: rollup for k, rollup in self.rollups.items() if k[:10] == day}
+                    if stunden:
+                        tag = StatsRollup()
+                        for rollup in stunden.values():
+                            tag.merge(rollup)
+                        # Erst sichern, dann löschen - ein doppelt geschriebener Tag überschreibt sich beim Laden
+                        self._archive_append(self.hourly_path, stunden)
+                        self._archive_append(self.daily_path, {day: tag})
+                        self.archive_hourly.update(stunden)
+                        self.archive_daily[day] = tag
+                    os.remove(self.segment_path(day))
+                    for stunde in stunden:
+                        del self.rollups[stunde]
+                    beginn = stats_zeitpunkt(day)
+                    lo = bisect_left(self.index_times, beginn)
+                    hi = bisect_left(self.index_times, beginn + timedelta(days=1) // MIKROSEKUNDE)
+                    del self.index_times[lo:hi], self.index_days[lo:hi], self.index_offsets[lo:hi]
+                logger.info(f"LKW-Bot: Statistik vom {day} gelöscht (älter als {self.retention_days} Tage)")
+            except OSError as e:
+                logger.error(f"LKW-Bot: Statistik vom {day} konnte nicht gelöscht werden: {e}")
+
+    def prune_archive(self):
+        """Entfernt Zusammenfassungen jenseits von hourly_rollup_days / daily_rollup_days aus Speicher und Datei"""
+        heute = datetime.now(pytz.timezone('Europe/Berlin')).date()
+        for path, archive, tage in ((self.hourly_path, self.archive_hourly, self.hourly_rollup_days),
+                                    (self.daily_path, self.archive_daily, self.daily_rollup_days)):
+            cutoff = (heute - timedelta(days=tage)).isoformat()
+            with self.lock:
+                alt = [k for k in archive if k[:10] < cutoff]
+                if not alt:
+                    continue
+                for key in alt:
+                    del archive[key]
+                tmp_path = path.with_suffix('.tmp')
+                try:
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        for key, rollup in sorted(archive.items()):
+                            f.write(json.dumps(dict(rollup.to_dict(), key=key)) + '\n')
+                    os.replace(tmp_path, path)
+                except Exception as e:
+                    logger.error(f"LKW-Bot: Fehler beim Kompaktieren von {path.name}: {e}")
+
+    def iter_records(self, start_day=None, end_day=None):
+        """Liefert die Einträge der Tage start_day..end_day (YYYY-MM-DD, jeweils einschließlich) in Zeitfolge"""
+        for day in self.days():
+            if start_day and day < start_day:
+                continue
+            if end_day and day > end_day:
+                break
+            for _, record in self._iter_segment(day):
+                yield record
+
+    def iter_range(self, start=None, end=None):
+        """Alle Einträge mit start <= stats_zeitpunkt(timestamp) <= end, Tag für Tag direkt aus den Dateien.
+
+        Anders als query() wird nichts gesammelt - für Exporte beliebiger Länge mit festem Speicherbedarf.
+        """
+        start_day = stats_tag(start) if start is not None else None
+        end_day = stats_tag(end) if end is not None else None
+        for record in self.iter_records(start_day, end_day):
+            try:
+                zeitpunkt = stats_zeitpunkt(record['timestamp'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if (start is None or zeitpunkt >= start) and (end is None or zeitpunkt <= end):
+                yield record
+
+    def query(self, start=None, end=None, offset=0, limit=None):
+        """Einträge mit start <= stats_zeitpunkt(timestamp) <= end, zeitlich sortiert.
+
+        Gibt (Gesamtzahl im Zeitraum, Einträge ab offset, höchstens limit Stück) zurück. Gelesen werden
+        nur die Zeilen der angeforderten Seite.
+        """
+        with self.lock:
+            lo = 0 if start is None else bisect_left(self.index_times, start)
+            hi = len(self.index_times) if end is None else bisect_right(self.index_times, end)
+            total = max(hi - lo, 0)
+            von = lo + max(offset, 0)
+            bis = hi if limit is None else min(hi, von + max(limit, 0))
+            tage = self.index_days[von:bis]
+            positionen = self.index_offsets[von:bis]
+        records = []
+        dateien = {}
+        try:
+            for tag, position in zip(tage, positionen):
+                f = dateien.get(tag)
+                if f is None:
+                    try:
+                        f = dateien[tag] = open(self.segment_path(datetime.fromordinal(tag).strftime('%Y-%m-%d')), 'rb')
+                    except FileNotFoundError:
+                        continue  # Gerade von drop_expired entfernt
+                f.seek(position)
+                try:
+                    records.append(json.loads(f.readline()))
+                except ValueError:
+                    continue
+        finally:
+            for f in dateien.values():
+                f.close()
+        return total, records
+
+    def _iter_segment(self, day):
+        """(Byte-Position, Eintrag) für jede lesbare Zeile einer Tagesdatei"""
+        try:
+            with open(self.segment_path(day), 'rb') as f:
+                offset = 0
+                for line in f:
+                    position, offset = offset, offset + len(line)
+                    try:
+                        yield position, json.loads(line)
+                    except ValueError:
+                        continue  # Abgebrochene Zeile (z.B. Stromausfall beim Schreiben)
+        except FileNotFoundError:
+            return  # Gerade von drop_expired entfernt
+
+    def _index_add(self, record, day, offset):
+        """Eintrag in Index und Stunden-Zusammenfassung aufnehmen (Aufrufer hält self.lock bzw. ist __init__)"""
+        zeitpunkt = stats_zeitpunkt(record['timestamp'])
+        tag = datetime.fromisoformat(day).toordinal()
+        if not self.index_times or zeitpunkt >= self.index_times[-1]:
+            self.index_times.append(zeitpunkt)
+            self.index_days.append(tag)
+            self.index_offsets.append(offset)
+        else:
+            # Nur bei der Zeitumstellung im Herbst (Stunde doppelt) oder beim Übernehmen alter Daten
+            pos = bisect_right(self.index_times, zeitpunkt)
+            self.index_times.insert(pos, zeitpunkt)
+            self.index_days.insert(pos, tag)
+            self.index_offsets.insert(pos, offset)
+        self.rollups.setdefault(record['timestamp'][:13], StatsRollup()).add(record)
+
+    def aggregate(self, start=None, end=None):
+        """Histogramme und Zeitreihe für das Dashboard aus den Zusammenfassungen.
+
+        start/end sind Zeitangaben wie bei /api/admin/stats ('YYYY-MM-DDTHH:MM:SS'); gefiltert wird
+        auf ganze Stunden. Pro Tag wird die feinste vorhandene Quelle genommen (Rohdaten, dann
+        archivierte Stunden, dann archivierte Tage); 'hourly' zählt nur stundengenaue Daten.
+        Der Aufwand hängt nur von der Zahl der Stunden/Tage ab, nicht von der Zahl der LKWs.
+        """
+        start_key = start[:13] if start else None
+        end_key = end[:13] if end else None
+        start_day = start[:10] if start else None
+        end_day = end[:10] if end else None
+        stunden = {}
+        tage = {}
+        nur_tage = False
+        hourly = [0] * 24
+        with self.lock:
+            quellen = dict(self.archive_hourly)
+            quellen.update(self.rollups)  # Rohdaten haben Vorrang
+            for stunde, rollup in quellen.items():
+                if (start_key and stunde < start_key) or (end_key and stunde > end_key):
+                    continue
+                stunden[stunde] = rollup
+                tage.setdefault(stunde[:10], StatsRollup()).merge(rollup)
+                hourly[int(stunde[11:13])] += rollup.count
+            for day, rollup in self.archive_daily.items():
+                if day in tage or (start_day and day < start_day) or (end_day and day > end_day):
+                    continue
+                tage[day] = rollup
+                nur_tage = True
+            gesamt = StatsRollup()
+            for rollup in tage.values():
+                gesamt.merge(rollup)
+
+        aufloesung = 'tag'
+        if tage and not nur_tage:
+            erster = datetime.fromisoformat(start_day or min(tage))
+            letzter = datetime.fromisoformat(end_day or max(tage))
+            if (letzter - erster).days < LKW_STATS_SERIES_HOURLY_DAYS:
+                aufloesung = 'stunde'
+        reihe = stunden if aufloesung == 'stunde' else tage
+        ergebnis = gesamt.summary()
+        ergebnis['total'] = ergebnis.pop('count')
+        ergebnis.update({
+            'strength_buckets': {'bins': LKW_STATS_BINS, 'counts': gesamt.buckets},
+            'daily': {day: rollup.count for day, rollup in sorted(tage.items())},
+            'hourly': hourly,
+            'servers': dict(gesamt.servers.most_common()),
+            'users': dict(gesamt.users.most_common()),
+            'resolution': aufloesung,
+            'series': [dict(reihe[key].summary(), time=key) for key in sorted(reihe)],
+        })
+        return ergebnis
+
+    def _load_archive(self, path):
+        archive = {}
+        if not path.exists():
+            return archive
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                    archive[data['key']] = StatsRollup.from_dict(data)  # Spätere Zeile gewinnt
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return archive
+
+    def _archive_append(self, path, rollups):
+        with open(path, 'a', encoding='utf-8') as f:
+            for key, rollup in sorted(rollups.items()):
+                f.write(json.dumps(dict(rollup.to_dict(), key=key)) + '\n')
+
+    def _rebuild(self):
+        """Index und Stunden-Zusammenfassungen beim Start einmal aus den Tagesdateien aufbauen"""
+        for day in self.days():
+            for offset, record in self._iter_segment(day):
+                try:
+                    self._index_add(record, day, offset)
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+    def _migrate(self, legacy_file):
+        """Übernimmt die alte truck_stats.json einmalig in Tagesdateien (vor _rebuild, ohne append).
+
+        Jede Tagesdatei wird als .tmp neu geschrieben (vorhandene Zeilen plus fehlende alte Einträge)
+        und per os.replace ersetzt. Bricht ein früherer Versuch vor dem Umbenennen der alten Datei ab,
+        werden schon übernommene Einträge beim nächsten Start erkannt statt doppelt geschrieben.
+        Einträge jenseits der Aufbewahrung werden gar nicht erst übernommen.
+        Gibt True zurück, wenn übernommen wurde.
+        """
+        if not legacy_file or not os.path.exists(legacy_file):
+            return False
+        try:
+            with open(legacy_file, 'r') as f:
+                content = f.read().strip()
+            records = json.loads(content) if content else []
+            cutoff = self.cutoff_day()
+            tage = {}
+            for record in sorted(records, key=lambda r: r['timestamp']):
+                if record['timestamp'][:10] >= cutoff:
+                    tage.setdefault(record['timestamp'][:10], []).append(record)
+            uebernommen = 0
+            for day, eintraege in tage.items():
+                path = self.segment_path(day)
+                vorhanden = []
+                if os.path.exists(path):
+                    with open(path, 'r', encoding='utf-8') as f:
+                        vorhanden = [line.rstrip('\n') for line in f if line.strip()]
+                bekannt = set(vorhanden)
+                neu = [line for line in (json.dumps(record, ensure_ascii=False) for record in eintraege)
+                       if line not in bekannt]
+                if not neu:
+                    continue
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.writelines(line + '\n' for line in vorhanden + neu)
+                os.replace(tmp_path, path)
+                uebernommen += len(neu)
+            os.replace(legacy_file, legacy_file + '.migrated')
+            logger.info(f"LKW-Bot: {uebernommen} von {len(records)} Statistik-Einträgen "
+                        f"aus {legacy_file} übernommen ({len(tage)} Tage)")
+            return True
+        except Exception as e:
+            logger.error(f"LKW-Bot: Alte Statistik {legacy_file} konnte nicht übernommen werden: {e}")
+            return False
+
+
+truck_stats = TruckStatsStore()
 
 
 # ================== User System (Erweitert) ==================
@@ -336,7 +2113,30 @@ class BotController:
         self.reset_interval = 15
         self.share_mode = "world"
         self.adb_connected = False
-        
+
+        self.screenshot_mode = SCREENSHOT_MODE
+        self.frames = {}  # Letzte Screenshots im Speicher, Schlüssel = alter Dateiname
+        self.settled_frame = None  # Ruhiger Bildschirm nach dem letzten Klick (None = Timeout)
+
+        self.use_frame_grabber = False
+        self.frame_grabber = None
+        self.last_input_time = 0.0    # Zeitpunkt der letzten Eingabe (Tap/Makro/Swipe)
+        self.last_frame_time = 0.0    # Aufnahmebeginn des zuletzt aus dem Ringpuffer geholten Frames
+
+        # Alle LKWs eines Listen-Screenshots nacheinander abarbeiten statt nur den besten
+        self.process_all_trucks = False
+        self.pending_trucks = []      # Noch offene Treffer vom letzten Listen-Screenshot
+        self.handled_trucks = []      # Positionen (x, y) bereits bearbeiteter Treffer derselben Liste
+        self.list_thumb = None        # Vergleichsbild des letzten Listen-Screenshots
+        self.list_screenshots = 0
+
+        # Bereits bearbeitete LKWs an der Listenzeile erkennen und gar nicht erst antippen
+        self.known_rows = RowHashIndex()
+        self.current_row_hash = None
+        self.info_roundtrips_avoided = 0
+
+        self.seen_strengths = SeenStrengthSet(LKW_STAERKEN_FILE, legacy_ttl=self.reset_interval * 60)
+
         self.mode_change_requests = self.load_mode_change_requests()
         
         self.last_success_time = time.time()
@@ -357,9 +2157,8 @@ class BotController:
     # ... (check_timer, load_maintenance_mode, set_maintenance_mode, ...)
     # ... (check_auto_maintenance, log_truck_stat, setup_ssh_tunnel, ...)
     # ... (close_ssh_tunnel, make_screenshot, click, swipe, ...)
-    # ... (ocr_staerke, ocr_server, ist_server_passend, rentier_lkw_finden, ...)
-    # ... (staerke_float_wert, load_staerken, save_staerke, reset_staerken, ...)
-    # ... (bot_loop, reset_timer, start, pause, stop)
+    # ... (rentier_lkw_finden, neue_treffer, unbekannte_treffer, liste_unveraendert, ...)
+    # ... (bot_loop, compact_timer, start, pause, stop)
 
     def load_mode_change_requests(self):
         if os.path.exists(MODE_REQUESTS_FILE):
@@ -446,36 +2245,16 @@ class BotController:
             self.set_maintenance_mode(True)
     
     def log_truck_stat(self, strength, server):
-        if not os.path.exists(LKW_STATS_FILE):
-            stats = []
-        else:
-            try:
-                with open(LKW_STATS_FILE, 'r') as f:
-                    content = f.read().strip()
-                    if content:
-                        stats = json.loads(content)
-                    else:
-                        stats = []
-            except (json.JSONDecodeError, ValueError):
-                logger.error(f"LKW-Bot: Korrupte Stats-Datei, erstelle neue")
-                stats = []
-        
         tz = pytz.timezone('Europe/Berlin')
         timestamp = datetime.now(tz).isoformat()
         
-        stats.append({
-            'strength': strength,
-            'server': server,
-            'timestamp': timestamp,
-            'user': self.current_user
-        })
-        
-        cutoff = datetime.now(tz) - timedelta(days=30)
-        stats = [s for s in stats if datetime.fromisoformat(s['timestamp']) > cutoff]
-        
         try:
-            with open(LKW_STATS_FILE, 'w') as f:
-                json.dump(stats, f, indent=2)
+            truck_stats.append({
+                'strength': strength,
+                'server': server,
+                'timestamp': timestamp,
+                'user': self.current_user
+            })
         except Exception as e:
             logger.error(f"LKW-Bot: Fehler beim Speichern der Stats: {e}")
 
@@ -553,6 +2332,7 @@ class BotController:
                 local_port = 8583 # Fallback
             
             logger.info(f"LKW-Bot: Trenne ADB von localhost:{local_port}")
+            close_adb_shell(f'localhost:{local_port}')
             subprocess.run(['adb', 'disconnect', f'localhost:{local_port}'], timeout=5, capture_output=True)
             
             if self.ssh_process:
@@ -570,144 +2350,186 @@ class BotController:
         except Exception as e:
             logger.error(f"LKW-Bot: Fehler beim Schließen des Tunnels: {e}")
     
+    def capture_frame(self):
+        """Direkter Screenshot im eingestellten Modus (auch Quelle für die Hintergrund-Aufnahme)"""
+        local_port = self.ssh_config.get('local_adb_port')
+        if not local_port:
+            raise RuntimeError("ADB-Port nicht konfiguriert")
+        return adb_screencap(f'localhost:{local_port}', self.screenshot_mode, 'grab.png', 'grab.png')
+
+    def start_frame_grabber(self):
+        self.stop_frame_grabber()
+        self.frame_grabber = FrameGrabber(self.capture_frame, "LKW-Bot")
+        self.frame_grabber.start()
+
+    def sync_frame_grabber(self):
+        """Startet/stoppt die Hintergrund-Aufnahme passend zu use_frame_grabber (nur im Bot-Thread aufrufen)"""
+        if self.use_frame_grabber and self.frame_grabber is None:
+            logger.info("LKW-Bot: Hintergrund-Aufnahme eingeschaltet")
+            self.start_frame_grabber()
+        elif not self.use_frame_grabber and self.frame_grabber is not None:
+            logger.info("LKW-Bot: Hintergrund-Aufnahme ausgeschaltet")
+            self.stop_frame_grabber()
+
+    def stop_frame_grabber(self):
+        # Erst austragen, dann stoppen - andere Threads sehen entweder den alten Grabber oder None
+        grabber, self.frame_grabber = self.frame_grabber, None
+        if grabber:
+            grabber.stop()
+
+    def frame_from_grabber(self, after, timeout=SCREEN_WAIT_TIMEOUT + 5):
+        """Neuester Frame aus dem Ringpuffer, aufgenommen nach 'after' - oder None"""
+        entry = self.frame_grabber.latest(after=after, timeout=timeout)
+        if entry is None:
+            return None
+        self.last_frame_time = entry[0]
+        return entry[1]
+
     def make_screenshot(self, filename='screen.png'):
+        """Nimmt einen Screenshot auf und legt ihn unter self.frames[filename] ab"""
         try:
             local_port = self.ssh_config.get('local_adb_port')
             if not local_port:
                 logger.error("LKW-Bot: ADB-Port nicht konfiguriert")
                 return False
             adb_device = f'localhost:{local_port}'
-            subprocess.run(['adb', '-s', adb_device, 'shell', 'screencap', '-p', f'/sdcard/{filename}'], 
-                         timeout=10, capture_output=True)
-            subprocess.run(['adb', '-s', adb_device, 'pull', f'/sdcard/{filename}', filename], 
-                         timeout=10, capture_output=True)
-            return os.path.exists(filename)
+            if self.frame_grabber is not None:
+                frame = self.frame_from_grabber(self.last_input_time)
+                if frame is None:
+                    raise RuntimeError("Kein aktueller Frame aus der Hintergrund-Aufnahme")
+            else:
+                frame = adb_screencap(adb_device, self.screenshot_mode, filename, filename)
+            self.frames[filename] = frame
+            return True
         except Exception as e:
             logger.error(f"LKW-Bot: Screenshot-Fehler: {e}")
+            self.frames.pop(filename, None)
             return False
     
-    def click(self, x, y):
+    def grab_frame(self):
+        """Screenshot nur für die Warte-Logik - wird nicht in self.frames abgelegt"""
+        try:
+            if self.frame_grabber is not None:
+                # Jeder Aufruf liefert einen neueren Frame als der vorige
+                return self.frame_from_grabber(max(self.last_input_time, self.last_frame_time), SCREEN_WAIT_TIMEOUT)
+            local_port = self.ssh_config.get('local_adb_port')
+            if not local_port: return None
+            return adb_screencap(f'localhost:{local_port}', self.screenshot_mode, 'wait.png', 'wait.png')
+        except Exception as e:
+            logger.warning(f"LKW-Bot: Warte-Screenshot fehlgeschlagen: {e}")
+            return None
+
+    def click(self, x, y, reference=None):
+        """Klickt und wartet bis sich der Bildschirm geändert und beruhigt hat (statt fester 2s).
+
+        reference: Frame von direkt vor dem Klick, falls schon vorhanden - spart einen Screenshot.
+        Der ruhige Bildschirm danach steht in self.settled_frame.
+        """
         try:
             local_port = self.ssh_config.get('local_adb_port')
             if not local_port: return False
             adb_device = f'localhost:{local_port}'
+            if reference is None:
+                reference = self.grab_frame()
             logger.info(f"LKW-Bot: Klicke auf ({x}, {y})")
-            subprocess.run(['adb', '-s', adb_device, 'shell', 'input', 'tap', str(x), str(y)], capture_output=True, timeout=5)
-            time.sleep(2)
+            get_adb_shell(adb_device).run(f'input tap {x} {y}', timeout=5)
+            self.last_input_time = time.time()
+            if reference is None:
+                self.settled_frame = None
+                time.sleep(2)
+                return True
+            self.settled_frame = wait_for_screen(self.grab_frame, reference=reference)
+            if self.settled_frame is None:
+                logger.info(f"LKW-Bot: Keine Bildschirmänderung nach {SCREEN_WAIT_TIMEOUT}s")
             return True
         except Exception as e:
             logger.error(f"LKW-Bot: Klick-Fehler: {e}")
             return False
     
-    def swipe(self, x1, y1, x2, y2, duration=500):
+    def tap_macro(self, steps):
+        """Führt eine Tap-Sequenz [(x, y, pause_danach), ...] in einer einzigen Shell-Zeile aus"""
         try:
             local_port = self.ssh_config.get('local_adb_port')
             if not local_port: return False
             adb_device = f'localhost:{local_port}'
-            subprocess.run(['adb', '-s', adb_device, 'shell', 'input', 'swipe', 
-                          str(x1), str(y1), str(x2), str(y2), str(duration)], capture_output=True)
+            logger.info(f"LKW-Bot: Tap-Makro {[(x, y) for x, y, _ in steps]}")
+            run_tap_macro(adb_device, steps)
+            self.last_input_time = time.time()
+            self.settled_frame = None
             return True
         except Exception as e:
-            logger.error(f"LKW-Bot: Swipe-Fehler: {e}")
+            logger.error(f"LKW-Bot: Makro-Fehler: {e}")
             return False
-    
-    def ocr_staerke(self):
-        try:
-            img = Image.open('info.png')
-            staerke_img = img.crop(STAERKE_BOX)
-            configs = ['--psm 7', '--psm 8', '--psm 6']
-            for config in configs:
-                wert = pytesseract.image_to_string(staerke_img, lang='eng', config=config).strip()
-                if wert and ('m' in wert.lower() or 'M' in wert):
-                    logger.info(f"LKW-Bot: OCR Stärke: {wert}")
-                    return wert
-            logger.warning("LKW-Bot: OCR konnte keine Stärke finden")
-            return ""
-        except Exception as e:
-            logger.error(f"LKW-Bot: OCR-Fehler: {e}")
-            return ""
 
-    def ocr_server(self):
-        try:
-            img = Image.open('info.png')
-            server_img = img.crop(SERVER_BOX)
-            server_text = pytesseract.image_to_string(server_img, lang='eng').strip()
-            logger.info(f"LKW-Bot: OCR Server: '{server_text}'")
-            s_txt = re.sub(r'[^0-9]', '', server_text)
-            return s_txt if s_txt else "Unknown"
-        except Exception as e:
-            logger.error(f"LKW-Bot: Server-OCR-Fehler: {e}")
-            return "Unknown"
-
-    def ist_server_passend(self):
+    def swipe(self, x1, y1, x2, y2, duration=500):
         try:
-            img = Image.open('info.png')
-            server_img = img.crop(SERVER_BOX)
-            server_text = pytesseract.image_to_string(server_img, lang='eng').strip()
-            logger.info(f"LKW-Bot: OCR Server: '{server_text}'")
-            s_txt = server_text.replace(' ', '').replace('O', '0')
-            return (f"#{self.server_number}" in s_txt) or (self.server_number in s_txt)
+            local_port = self.ssh_config.get('local_adb_port')
+            if not local_port: return False
+            adb_device = f'localhost:{local_port}'
+            get_adb_shell(adb_device).run(f'input swipe {x1} {y1} {x2} {y2} {duration}', timeout=5 + duration / 1000)
+            self.last_input_time = time.time()
+            return True
         except Exception as e:
-            logger.error(f"LKW-Bot: Server-Check-Fehler: {e}")
+            logger.error(f"LKW-Bot: Swipe-Fehler: {e}")
             return False
-
+    
     def rentier_lkw_finden(self):
         try:
-            screenshot = cv2.imread('screen.png')
-            template = cv2.imread(LKW_TEMPLATE_FILE)
+            screenshot = self.frames.get('screen.png')
             if screenshot is None:
-                logger.error("LKW-Bot: Screenshot-Datei 'screen.png' konnte nicht gelesen werden")
+                logger.error("LKW-Bot: Kein Screenshot 'screen.png' im Speicher")
                 return None
-            if template is None:
-                logger.error(f"LKW-Bot: Template-Datei '{LKW_TEMPLATE_FILE}' konnte nicht gelesen werden")
+            matches = lkw_templates.match(screenshot, LKW_MATCH_THRESHOLD)
+            if matches is None:
+                logger.error(f"LKW-Bot: Keine Template-Datei aus {LKW_TEMPLATE_FILES} konnte gelesen werden")
                 return None
-            result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
-            locations = np.where(result >= 0.40)
-            matches = [(int(pt[0]), int(pt[1])) for pt in zip(*locations[::-1])]
             return matches if matches else None
         except Exception as e:
             logger.error(f"LKW-Bot: Template-Matching-Fehler: {e}")
             return None
 
-    def staerke_float_wert(self, staerke_text):
-        match = re.search(r"([\d\.,]+)\s*[mM]", staerke_text)
-        if match:
-            try:
-                zahl_str = match.group(1).replace(',', '.')
-                zahl = float(zahl_str)
-                if zahl >= 100 and '.' not in match.group(1) and ',' not in match.group(1):
-                    zahl = zahl / 10
-                    logger.info(f"LKW-Bot: Komma-Korrektur: {match.group(1)}M → {zahl}M")
-                return zahl
-            except ValueError:
-                return None
-        return None
-
-    def load_staerken(self):
-        if os.path.exists(LKW_STAERKEN_FILE):
-            try:
-                with open(LKW_STAERKEN_FILE, 'r', encoding="utf-8") as f:
-                    return f.read().splitlines()
-            except Exception as e:
-                logger.error(f"LKW-Bot: Fehler beim Laden der Stärken: {e}")
-                return []
-        return []
-    
-    def save_staerke(self, staerke):
-        try:
-            with open(LKW_STAERKEN_FILE, "a", encoding="utf-8") as f:
-                f.write(staerke + "\n")
-            logger.info(f"LKW-Bot: Stärke {staerke} notiert")
-        except Exception as e:
-            logger.error(f"LKW-Bot: Fehler beim Notieren der Stärke: {e}")
-    
-    def reset_staerken(self):
-        try:
-            with open(LKW_STAERKEN_FILE, "w", encoding="utf-8") as f:
-                f.write("")
-            logger.info("LKW-Bot: Stärken-Liste zurückgesetzt")
-        except Exception as e:
-            logger.error(f"LKW-Bot: Reset-Fehler: {e}")
+    def neue_treffer(self, treffer):
+        """Filtert Treffer, die auf derselben Liste schon bearbeitet wurden.
+
+        Hat sich die Liste seit dem letzten Screenshot verändert, gilt nichts als bearbeitet.
+        """
+        thumb = frame_thumbnail(self.frames['screen.png'])
+        if self.list_thumb is None or thumbnail_difference(thumb, self.list_thumb) >= SCREEN_CHANGE_THRESHOLD:
+            self.handled_trucks = []
+        self.list_thumb = thumb
+        return [t for t in treffer
+                if all(abs(t.x - hx) > HANDLED_TRUCK_RADIUS or abs(t.y - hy) > HANDLED_TRUCK_RADIUS
+                       for hx, hy in self.handled_trucks)]
+
+    def unbekannte_treffer(self, treffer):
+        """Verwirft Treffer, deren Listenzeile schon bearbeitet wurde (spart Klick, Info-Screenshot und OCR)"""
+        frame = self.frames['screen.png']
+        neue = [t for t in treffer if not self.known_rows.contains(row_hash(frame, list_row_box(frame, t)))]
+        bekannt = len(treffer) - len(neue)
+        if bekannt:
+            self.info_roundtrips_avoided += bekannt
+            logger.info(f"LKW-Bot: {bekannt} bekannte LKW-Zeile(n) ohne Antippen übersprungen "
+                        f"({self.info_roundtrips_avoided} gesamt)")
+        return neue
+
+    def zeile_merken(self):
+        """Merkt sich die Listenzeile des aktuellen LKWs bis zum nächsten Stärken-Reset"""
+        if self.current_row_hash is not None:
+            self.known_rows.add(self.current_row_hash, self.reset_interval * 60)
+            self.current_row_hash = None
+
+    def liste_unveraendert(self):
+        """Prüft ob (nach dem ESC aus dem Info-Fenster) wieder dieselbe Liste zu sehen ist"""
+        if self.list_thumb is None:
+            return False
+        frame = self.settled_frame if self.settled_frame is not None else self.grab_frame()
+        if frame is None:
+            return False
+        if thumbnail_difference(frame_thumbnail(frame), self.list_thumb) >= SCREEN_CHANGE_THRESHOLD:
+            return False
+        # Aktueller Stand der Liste dient als Referenz für den nächsten Klick
+        self.frames['screen.png'] = frame
+        return True
 
     def bot_loop(self):
         logger.info("LKW-Bot: Bot-Schleife gestartet")
@@ -716,8 +2538,10 @@ class BotController:
             self.running = False
             return
         
-        reset_thread = threading.Thread(target=self.reset_timer, daemon=True)
-        reset_thread.start()
+        compact_thread = threading.Thread(target=self.compact_timer, daemon=True)
+        compact_thread.start()
+        
+        self.sync_frame_grabber()
         
         if self.use_timer:
             self.timer_start_time = time.time()
@@ -726,6 +2550,9 @@ class BotController:
             logger.info(f"LKW-Bot: Auto-Stop Timer gestartet für {self.timer_duration_minutes} Minuten")
         
         while self.running:
+            # use_frame_grabber kann über /api/settings während des Laufs geändert werden
+            self.sync_frame_grabber()
+            
             if self.paused:
                 self.status = "Pausiert"
                 time.sleep(1)
@@ -739,45 +2566,79 @@ class BotController:
 
             try:
                 self.status = "Läuft - Suche LKWs..."
-                self.last_action = "Screenshot erstellen"
                 
-                if not self.make_screenshot('screen.png'):
-                    self.last_action = "Fehler: Screenshot fehlgeschlagen"
-                    time.sleep(5)
-                    continue
+                bester = None
+                if self.process_all_trucks and self.pending_trucks:
+                    if self.liste_unveraendert():
+                        bester = self.pending_trucks.pop(0)
+                        self.last_action = f"Nächster LKW vom selben Screenshot bei ({bester.x}, {bester.y})"
+                        logger.info(f"LKW-Bot: Nächster Treffer ohne neuen Screenshot: ({bester.x}, {bester.y}) "
+                                    f"Score {bester.score:.2f} ({len(self.pending_trucks)} übrig)")
+                    else:
+                        logger.info("LKW-Bot: Liste hat sich verändert - verwerfe offene Treffer")
+                        self.pending_trucks = []
                 
-                time.sleep(0.5)
-                treffer = self.rentier_lkw_finden()
+                if bester is None:
+                    self.last_action = "Screenshot erstellen"
+                    if not self.make_screenshot('screen.png'):
+                        self.last_action = "Fehler: Screenshot fehlgeschlagen"
+                        time.sleep(5)
+                        continue
+                    self.list_screenshots += 1
+                    
+                    treffer = self.rentier_lkw_finden()
+                    if treffer and self.process_all_trucks:
+                        treffer = self.neue_treffer(treffer)
+                    if treffer:
+                        treffer = self.unbekannte_treffer(treffer)
+                    
+                    if not treffer:
+                        self.last_action = "Kein LKW gefunden - ESC"
+                        self.click(COORDS_NEW['esc'][0], COORDS_NEW['esc'][1], reference=self.frames['screen.png'])
+                        self.handled_trucks = []
+                        self.trucks_processed += 1
+                        continue
+                    
+                    # Treffer sind nach Score sortiert - treffer[0] ist der beste
+                    bester = treffer[0]
+                    if self.process_all_trucks:
+                        self.pending_trucks = treffer[1:]
+                    self.last_action = f"LKW gefunden bei ({bester.x}, {bester.y}), Score {bester.score:.2f}"
+                    logger.info(f"LKW-Bot: Treffer bei: ({bester.x}, {bester.y}) Score {bester.score:.2f} [{bester.template}] ({len(treffer)} gesamt)")
                 
-                if not treffer:
-                    self.last_action = "Kein LKW gefunden - ESC"
-                    self.click(COORDS_NEW['esc'][0], COORDS_NEW['esc'][1])
-                    self.trucks_processed += 1
-                    continue
+                if self.process_all_trucks:
+                    self.handled_trucks.append((bester.x, bester.y))
                 
-                self.last_action = f"LKW gefunden bei {treffer[0]}"
-                logger.info(f"LKW-Bot: Treffer bei: {treffer[0]}")
+                liste = self.frames['screen.png']
+                self.current_row_hash = row_hash(liste, list_row_box(liste, bester))
                 
-                lx = treffer[0][0] + 5
-                ly = treffer[0][1] + 5
-                self.click(lx, ly)
+                lx = bester.x + 5
+                ly = bester.y + 5
+                self.click(lx, ly, reference=liste)
                 
-                if not self.make_screenshot('info.png'):
+                # Der ruhige Bildschirm nach dem Klick ist bereits das Info-Fenster
+                if self.settled_frame is not None:
+                    self.frames['info.png'] = self.settled_frame
+                elif not self.make_screenshot('info.png'):
                     self.last_action = "Fehler: Info-Screenshot fehlgeschlagen"
                     continue
                 
+                # Stärke und Server werden einmal (parallel) gelesen und von allen Prüfungen geteilt
+                info = InfoPanelReading(self.frames['info.png'])
+                
                 if self.use_server_filter:
                     self.last_action = "Prüfe Server..."
-                    if not self.ist_server_passend():
+                    if not info.server_passt(self.server_number):
                         self.last_action = f"Falscher Server - ESC"
-                        self.click(COORDS_NEW['esc'][0], COORDS_NEW['esc'][1])
+                        self.zeile_merken()
+                        self.click(COORDS_NEW['esc'][0], COORDS_NEW['esc'][1], reference=self.frames['info.png'])
                         self.trucks_skipped += 1
                         self.trucks_processed += 1
                         continue
                 
                 self.last_action = "Lese Stärke..."
-                staerke = self.ocr_staerke()
-                wert = self.staerke_float_wert(staerke)
+                staerke = info.staerke
+                wert = info.wert
                 logger.info(f"LKW-Bot: Stärke gelesen: '{staerke}' Wert: {wert}")
                 
                 limit_passed = True
@@ -786,26 +2647,40 @@ class BotController:
                         limit_passed = False
                         self.last_action = f"Stärke {wert} > {self.strength_limit} - übersprungen"
                 
-                if wert is None or not limit_passed or (staerke in self.load_staerken()):
+                # Ohne Server-Filter zählt nur die Stärke - der Server wird erst für geteilte LKWs gelesen
+                bekannt = False
+                if wert is not None and limit_passed:
+                    if self.use_server_filter:
+                        schluessel = staerke_schluessel(wert, info.server)
+                        bekannt = schluessel in self.seen_strengths or staerke_schluessel(wert) in self.seen_strengths
+                    else:
+                        schluessel = staerke_schluessel(wert)
+                        bekannt = self.seen_strengths.enthaelt_wert(wert)
+                
+                if wert is None or not limit_passed or bekannt:
                     if wert is None:
                         self.last_action = "Keine Stärke erkannt - Lade Liste neu"
-                        self.click(COORDS_NEW['esc'][0], COORDS_NEW['esc'][1])
-                        time.sleep(0.5)
+                        self.pending_trucks = []
+                        self.handled_trucks = []
+                        self.click(COORDS_NEW['esc'][0], COORDS_NEW['esc'][1], reference=self.frames['info.png'])
                         self.click(COORDS_NEW['esc'][0], COORDS_NEW['esc'][1])
                     elif not limit_passed:
                         self.last_action = f"Stärke {wert} > {self.strength_limit} - übersprungen"
-                        self.click(COORDS_NEW['esc'][0], COORDS_NEW['esc'][1])
+                        self.zeile_merken()
+                        self.click(COORDS_NEW['esc'][0], COORDS_NEW['esc'][1], reference=self.frames['info.png'])
                     else:
                         self.last_action = f"Stärke {staerke} bereits bekannt - übersprungen"
-                        self.click(COORDS_NEW['esc'][0], COORDS_NEW['esc'][1])
+                        self.zeile_merken()
+                        self.click(COORDS_NEW['esc'][0], COORDS_NEW['esc'][1], reference=self.frames['info.png'])
                     
                     self.trucks_skipped += 1
                     self.trucks_processed += 1
                     continue
                 
                 self.last_action = f"Teile LKW (Stärke: {staerke})"
-                self.save_staerke(staerke)
-                server = self.ocr_server()
+                self.seen_strengths.add(schluessel, self.reset_interval * 60)
+                server = info.server
+                logger.info(f"LKW-Bot: Stärke {staerke} (Server {server}) notiert")
                 
                 if self.share_mode == "alliance":
                     coords = COORDS_ALLIANCE
@@ -816,10 +2691,8 @@ class BotController:
                 
                 self.last_action = f"Teile LKW im {mode_text} (Stärke: {staerke})"
                 
-                self.click(coords['share'][0], coords['share'][1])
-                self.click(coords['share_confirm1'][0], coords['share_confirm1'][1])
-                self.click(coords['share_confirm2'][0], coords['share_confirm2'][1])
-                self.click(coords['esc'][0], coords['esc'][1])
+                self.tap_macro([coords[schritt] for schritt in SHARE_SEQUENCE])
+                self.zeile_merken()
                 
                 self.trucks_shared += 1
                 self.trucks_processed += 1
@@ -836,16 +2709,18 @@ class BotController:
             
             self.check_auto_maintenance()
         
+        self.stop_frame_grabber()
         self.close_ssh_tunnel()
         self.status = "Gestoppt"
         logger.info("LKW-Bot: Bot-Schleife beendet")
     
-    def reset_timer(self):
+    def compact_timer(self):
+        # Jede Stärke läuft nach reset_interval Minuten einzeln ab - hier wird nur die Datei aufgeräumt
         while self.running:
-            time.sleep(self.reset_interval * 60)
+            time.sleep(STAERKEN_COMPACT_INTERVAL)
             if self.running:
-                self.reset_staerken()
-                self.last_action = f"Stärken-Liste nach {self.reset_interval} Min. zurückgesetzt"
+                verbleibend = self.seen_strengths.compact()
+                logger.info(f"LKW-Bot: Stärken-Journal kompaktiert ({verbleibend} aktiv)")
     
     def start(self):
         if not self.running:
@@ -875,6 +2750,20 @@ class BotController:
 bot = BotController()
 
 
+# ================== Trupp-Auswahl (Allgemeine Funktionen) ==================
+
+# Strategien: welcher von mehreren gleichzeitig verfügbaren Trupps losgeschickt wird.
+# Jede bekommt die Liste der verfügbaren TruppTimer und gibt einen davon zurück.
+# Vergleichen lassen sie sich offline mit simulate_zombie.py.
+TRUPP_POLICIES = {
+    'kuerzester_cooldown': lambda timers: min(timers, key=lambda t: t.get_letzte_cooldown_sekunden()),
+    'laengster_cooldown': lambda timers: max(timers, key=lambda t: t.get_letzte_cooldown_sekunden()),
+    'reihenfolge': lambda timers: min(timers, key=lambda t: t.trupp_nummer),
+    'am_laengsten_bereit': lambda timers: min(timers, key=lambda t: t.verfuegbar_ab or datetime.min),
+}
+TRUPP_POLICY = 'kuerzester_cooldown'
+
+
 # ================== Bot-Steuerung (Gold-Zombie-Bot) ==================
 
 class GoldZombieController:
@@ -893,31 +2782,58 @@ class GoldZombieController:
     TIMER_REGION = (250, 1150, 650, 1300) # (x1, y1, x2, y2)
 
     class TruppTimer:
-        """Interne Klasse zur Verwaltung von Trupp-Cooldowns"""
-        def __init__(self, trupp_nummer):
+        """Interne Klasse zur Verwaltung von Trupp-Cooldowns (uhr: z.B. virtuelle Uhr im Simulator)"""
+        def __init__(self, trupp_nummer, uhr=datetime.now):
             self.trupp_nummer = trupp_nummer
+            self.uhr = uhr
             self.verfuegbar_ab = None
             self.letzte_cooldown_sekunden = 0
         
         def set_timer(self, stunden, minuten, sekunden):
             dauer = timedelta(hours=stunden, minutes=minuten, seconds=sekunden)
-            self.verfuegbar_ab = datetime.now() + dauer
+            self.verfuegbar_ab = self.uhr() + dauer
             self.letzte_cooldown_sekunden = stunden * 3600 + minuten * 60 + sekunden
             logger.info(f"Zombie-Bot: Trupp {self.trupp_nummer} Timer: {stunden:02d}:{minuten:02d}:{sekunden:02d}")
         
         def ist_verfuegbar(self):
             if self.verfuegbar_ab is None:
                 return True
-            return datetime.now() >= self.verfuegbar_ab
+            return self.uhr() >= self.verfuegbar_ab
         
         def zeit_bis_verfuegbar(self):
             if self.ist_verfuegbar():
                 return 0
-            return (self.verfuegbar_ab - datetime.now()).total_seconds()
+            return (self.verfuegbar_ab - self.uhr()).total_seconds()
         
         def get_letzte_cooldown_sekunden(self):
             return self.letzte_cooldown_sekunden
 
+    class TruppPlaner:
+        """Prioritäts-Queue der Trupps nach verfuegbar_ab - der als nächstes fällige Trupp liegt vorne"""
+        def __init__(self, uhr=datetime.now):
+            self.uhr = uhr
+            self.heap = []
+        
+        def plane(self, timer):
+            faellig = timer.verfuegbar_ab or datetime.min
+            heapq.heappush(self.heap, (faellig, timer.trupp_nummer, timer))
+        
+        def naechster(self):
+            return self.heap[0][2] if self.heap else None
+        
+        def sekunden_bis_naechster(self):
+            if not self.heap:
+                return None
+            return max(0.0, (self.heap[0][0] - self.uhr()).total_seconds())
+        
+        def entnimm_faellige(self):
+            """Nimmt alle jetzt verfügbaren Trupps aus der Queue"""
+            jetzt = self.uhr()
+            faellige = []
+            while self.heap and self.heap[0][0] <= jetzt:
+                faellige.append(heapq.heappop(self.heap)[2])
+            return faellige
+
     def __init__(self):
         self.running = False
         self.paused = False
@@ -939,10 +2855,14 @@ class GoldZombieController:
         self.use_trupp_1 = False
         self.use_trupp_2 = True
         self.use_trupp_3 = True
+        self.trupp_policy = TRUPP_POLICY
         
         # SSH & ADB
         self.adb_connected = False
         self.ssh_config = load_ssh_config(GOLD_ZOMBIE_SSH_CONFIG_FILE) # EIGENE Config-Datei
+        self.screenshot_mode = SCREENSHOT_MODE
+        self.settled_frame = None  # Ruhiger Bildschirm nach dem letzten tap() (None = Timeout/unbekannt)
+        self.wake_event = threading.Event()  # Weckt die Warteschleife bei Stopp/Pause sofort auf
 
         # Screenshot-Ordner erstellen
         Path(GOLD_ZOMBIE_SCREENSHOT_DIR).mkdir(exist_ok=True)
@@ -1020,6 +2940,7 @@ class GoldZombieController:
                 local_port = 8676 # Fallback
             
             logger.info(f"Zombie-Bot: Trenne ADB von localhost:{local_port}")
+            close_adb_shell(f'localhost:{local_port}')
             subprocess.run(['adb', 'disconnect', f'localhost:{local_port}'], timeout=5, capture_output=True)
             
             if self.ssh_process:
@@ -1037,161 +2958,170 @@ class GoldZombieController:
         except Exception as e:
             logger.error(f"Zombie-Bot: Fehler beim Schließen des Tunnels: {e}")
 
-    def tap(self, x, y):
-        """Simuliert einen Tap für den Zombie-Bot"""
+    def grab_frame(self):
+        """Screenshot nur für die Warte-Logik (ohne Datei, ohne Log)"""
+        try:
+            local_port = self.ssh_config.get('local_adb_port')
+            if not local_port: return None
+            return adb_screencap(f'localhost:{local_port}', self.screenshot_mode,
+                                 Path(GOLD_ZOMBIE_SCREENSHOT_DIR) / 'wait.png', 'wait.png')
+        except Exception as e:
+            logger.warning(f"Zombie-Bot: Warte-Screenshot fehlgeschlagen: {e}")
+            return None
+
+    def tap(self, x, y, reference=None, pause=3):
+        """Simuliert einen Tap für den Zombie-Bot und wartet bis der Bildschirm ruhig ist.
+
+        reference: Frame von direkt vor dem Tap. Ohne Angabe wird der ruhige Bildschirm des letzten
+        Taps genommen (settled_frame) - nur wenn keiner da ist, wird fotografiert.
+        pause:     feste Pause der alten Sequenz - höchstens so lange wird auf den Bildschirm gewartet,
+        ohne Frame wird sie einfach abgewartet.
+        """
         try:
             local_port = self.ssh_config.get('local_adb_port')
             if not local_port: return False
             adb_device = f'localhost:{local_port}'
+            if reference is None:
+                reference = self.settled_frame
+            if reference is None:
+                reference = self.grab_frame()
+            self.settled_frame = None
             logger.info(f"Zombie-Bot: Klicke auf ({x}, {y})")
-            subprocess.run(['adb', '-s', adb_device, 'shell', 'input', 'tap', str(x), str(y)], capture_output=True, timeout=5)
-            time.sleep(2) # Original-Sleep
+            get_adb_shell(adb_device).run(f'input tap {x} {y}', timeout=5)
+            if reference is None:
+                time.sleep(pause) # Original-Sleep (2s) + Pause der Aufrufer
+            else:
+                self.settled_frame = wait_for_screen(self.grab_frame, reference=reference, timeout=pause)
+                if self.settled_frame is None:
+                    logger.info(f"Zombie-Bot: Keine Bildschirmänderung nach {pause}s")
             return True
         except Exception as e:
             logger.error(f"Zombie-Bot: Klick-Fehler: {e}")
             return False
 
+    def tap_folge(self, steps):
+        """Tippt [(x, y, pause), ...] nacheinander; vor jedem Schritt wird auf Stopp geprüft.
+
+        Wie beim LKW-Bot wird nach jedem Tap auf den ruhigen Bildschirm gewartet, die alten festen
+        Pausen sind nur noch die Obergrenze. Gibt False zurück, wenn abgebrochen wurde.
+        """
+        for x, y, pause in steps:
+            if not self.running:
+                logger.info("Zombie-Bot: Tap-Folge abgebrochen (gestoppt)")
+                return False
+            self.tap(x, y, pause=pause)
+        return True
+
     def take_screenshot(self, filename="screenshot.png"):
-        """Macht einen Screenshot für den Zombie-Bot"""
+        """Macht einen Screenshot für den Zombie-Bot und gibt ihn als Array zurück (BGR oder RGBA-Sicht bei 'raw')"""
         try:
             local_port = self.ssh_config.get('local_adb_port')
-            if not local_port: return False
+            if not local_port: return None
             adb_device = f'localhost:{local_port}'
 
             screenshot_path = Path(GOLD_ZOMBIE_SCREENSHOT_DIR) / filename
-            
-            subprocess.run(['adb', '-s', adb_device, 'shell', 'screencap', '-p', f'/sdcard/{filename}'], 
-                         timeout=10, capture_output=True)
-            
-            pull_command = f'adb -s {adb_device} pull /sdcard/{filename} "{screenshot_path}"'
-            result = subprocess.run(pull_command, shell=True, capture_output=True, text=True)
-
-            if result.returncode != 0:
-                logger.error(f"Zombie-Bot: Fehler beim Herunterladen des Screenshots: {result.stderr}")
-                return None
-            
-            if not screenshot_path.exists():
-                logger.error(f"Zombie-Bot: Screenshot wurde nicht erstellt: {screenshot_path}")
-                return None
-            
-            logger.info(f"Zombie-Bot: Screenshot gespeichert: {screenshot_path}")
-            return screenshot_path
+            frame = adb_screencap(adb_device, self.screenshot_mode, screenshot_path, filename)
+            if self.screenshot_mode == 'file':
+                logger.info(f"Zombie-Bot: Screenshot gespeichert: {screenshot_path}")
+            return frame
         except Exception as e:
             logger.error(f"Zombie-Bot: Screenshot-Fehler: {e}")
             return None
 
     # --- Spiel-Logik-Funktionen (aus altem Skript) ---
     
-    def pruefe_ausdauer_erhalten(self):
-        """Prüft ob "Ausdauer erhalten" im Timer-Bereich angezeigt wird"""
-        try:
-            screenshot_path = self.take_screenshot("ausdauer_check.png")
-            if screenshot_path is None:
-                return False
-            
-            img = Image.open(screenshot_path)
-            x1, y1, x2, y2 = self.TIMER_REGION
-            cropped = img.crop((x1, y1, x2, y2))
-            cropped_gray = cropped.convert('L')
-            
-            text = pytesseract.image_to_string(cropped_gray, config='--psm 6')
-            text_clean = text.replace('\n', ' ').replace(' ', '').lower()
-            
-            logger.info(f"Zombie-Bot: Suche nach 'Ausdauer erhalten': '{text.strip()}'")
-            
-            if 'ausdauer' in text_clean and 'erhalten' in text_clean:
-                logger.info(f"Zombie-Bot: 'Ausdauer erhalten' gefunden!")
-                return True
-            else:
-                logger.info(f"Zombie-Bot: 'Ausdauer erhalten' nicht gefunden")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Zombie-Bot: Fehler bei Ausdauer-Prüfung: {e}")
-            return False
-
     def sammle_ausdauer(self):
         """Sammelt Ausdauer wenn verfügbar"""
         logger.info("Zombie-Bot: Sammle Ausdauer...")
         
-        self.tap(*self.BESTAETIGEN)
-        time.sleep(1)
+        # Alle Taps werden gesammelt und dann nacheinander getippt (höchstens 3s wie vorher tap + sleep)
+        schritte = [(*self.BESTAETIGEN, 3)]
         
         ausdauer_gesammelt = False
         
         if self.unbegrenzt_mode or self.ausdauer_50_verwendet < self.ausdauer_50_limit:
             logger.info(f"Zombie-Bot: Klicke auf 50 Ausdauer ({self.ausdauer_50_verwendet + 1}/{self.ausdauer_50_limit if not self.unbegrenzt_mode else '∞'})")
-            self.tap(*self.AUSDAUER_50)
+            schritte.append((*self.AUSDAUER_50, 3))
             self.ausdauer_50_verwendet += 1
             ausdauer_gesammelt = True
-            time.sleep(1)
         
         if self.unbegrenzt_mode or self.ausdauer_10_verwendet < self.ausdauer_10_limit:
             logger.info(f"Zombie-Bot: Klicke auf 10 Ausdauer ({self.ausdauer_10_verwendet + 1}/{self.ausdauer_10_limit if not self.unbegrenzt_mode else '∞'})")
-            self.tap(*self.AUSDAUER_10)
+            schritte.append((*self.AUSDAUER_10, 3))
             self.ausdauer_10_verwendet += 1
             ausdauer_gesammelt = True
-            time.sleep(1)
         
         logger.info("Zombie-Bot: Schließe Ausdauer-Fenster")
-        self.tap(*self.AUSDAUER_SCHLIESSEN)
-        time.sleep(1)
+        schritte.append((*self.AUSDAUER_SCHLIESSEN, 3))
         
         logger.info("Zombie-Bot: Klicke auf Bestätigen nach Ausdauer sammeln...")
-        self.tap(*self.BESTAETIGEN)
-        time.sleep(1)
+        schritte.append((*self.BESTAETIGEN, 3))
+        
+        self.tap_folge(schritte)
         
         if not ausdauer_gesammelt:
             logger.warning("Zombie-Bot: Ausdauer-Limit erreicht!")
             
         return ausdauer_gesammelt
 
-    def extract_timer_from_region(self):
-        """Extrahiert die Timer-Zeit aus dem definierten Bereich"""
+    @staticmethod
+    def klassifiziere_timer_text(text):
+        """Ordnet den OCR-Text von TIMER_REGION ein: ('ausdauer', None), ('timer', (h, m, s)) oder ('unbekannt', None)"""
+        text_clean = text.replace('\n', ' ').replace(' ', '').lower()
+        if 'ausdauer' in text_clean and 'erhalten' in text_clean:
+            return 'ausdauer', None
+        match = re.search(r'(\d{1,2}):(\d{2}):(\d{2})', text)
+        if match:
+            return 'timer', tuple(int(teil) for teil in match.groups())
+        return 'unbekannt', None
+
+    def lies_timer_bereich(self, filename="timer_check.png"):
+        """Ein Bild und eine OCR von TIMER_REGION - "Ausdauer erhalten" oder Timer hh:mm:ss.
+
+        Nach tap() wird der bereits aufgenommene ruhige Bildschirm verwendet, sonst ein neuer Screenshot.
+        """
         try:
-            screenshot_path = self.take_screenshot("timer_check.png")
-            if screenshot_path is None:
-                return None
+            frame = self.settled_frame
+            self.settled_frame = None
+            if frame is None:
+                frame = self.take_screenshot(filename)
+            if frame is None:
+                return 'unbekannt', None
             
-            img = Image.open(screenshot_path)
-            x1, y1, x2, y2 = self.TIMER_REGION
-            cropped = img.crop((x1, y1, x2, y2))
+            cropped = frame_crop(frame, self.TIMER_REGION)
+            text = submit_pipeline(cropped, 'timer').result(OCR_TIMEOUT).text
+            logger.info(f"Zombie-Bot: OCR Timer-Bereich: '{text.strip()}'")
             
-            cropped_gray = cropped.convert('L')
-            
-            text = pytesseract.image_to_string(cropped_gray, config='--psm 6')
-            logger.info(f"Zombie-Bot: OCR Text: '{text.strip()}'")
-            
-            pattern = r'(\d{1,2}):(\d{2}):(\d{2})'
-            match = re.search(pattern, text)
-            
-            if match:
-                stunden = int(match.group(1))
-                minuten = int(match.group(2))
-                sekunden = int(match.group(3))
-                logger.info(f"Zombie-Bot: Zeit erkannt: {stunden:02d}:{minuten:02d}:{sekunden:02d}")
-                return (stunden, minuten, sekunden)
+            art, zeit = self.klassifiziere_timer_text(text)
+            if art == 'ausdauer':
+                logger.info(f"Zombie-Bot: 'Ausdauer erhalten' gefunden!")
+            elif art == 'timer':
+                logger.info(f"Zombie-Bot: Zeit erkannt: {zeit[0]:02d}:{zeit[1]:02d}:{zeit[2]:02d}")
             else:
-                logger.warning(f"Zombie-Bot: Keine Zeit im Format xx:xx:xx gefunden")
-                return None
-                
+                logger.warning(f"Zombie-Bot: Weder 'Ausdauer erhalten' noch Zeit im Format xx:xx:xx gefunden")
+            return art, zeit
         except Exception as e:
             logger.error(f"Zombie-Bot: Fehler bei OCR: {e}")
-            return None
+            return 'unbekannt', None
+
+    def setze_trupp_timer(self, trupp_timer, timer_daten):
+        if timer_daten:
+            trupp_timer.set_timer(*timer_daten)
+        else:
+            logger.warning(f"Zombie-Bot: Konnte Timer für Trupp {trupp_timer.trupp_nummer} nicht lesen! Setze 1 Min Fallback.")
+            trupp_timer.set_timer(0, 1, 0)
 
     def schritte_1_bis_3(self):
         """Führt die Schritte 1-3 aus"""
         if not self.running: return
         logger.info("Zombie-Bot: Führe Schritte 1-3 aus...")
         
-        self.tap(*self.CLICK_1)
-        if not self.running: return
-        time.sleep(1)
-        self.tap(*self.CLICK_2)
-        if not self.running: return
-        time.sleep(3)
-        self.tap(*self.CLICK_3)
-        time.sleep(1)
+        # Obergrenzen entsprechen dem alten tap() (2s) + anschließendem sleep
+        self.tap_folge([
+            (*self.CLICK_1, 3),
+            (*self.CLICK_2, 5),
+            (*self.CLICK_3, 3),
+        ])
 
     def waehle_trupp_und_setze_timer(self, trupp_position, trupp_timer):
         """Wählt eine Truppe aus und setzt deren Timer"""
@@ -1199,11 +3129,11 @@ class GoldZombieController:
         
         logger.info(f"Zombie-Bot: Wähle Trupp {trupp_timer.trupp_nummer}...")
         self.tap(*trupp_position)
-        time.sleep(1)
         
         if not self.running: return "gestoppt"
         
-        if self.pruefe_ausdauer_erhalten():
+        art, timer_daten = self.lies_timer_bereich()
+        if art == 'ausdauer':
             if not self.unbegrenzt_mode and self.ausdauer_50_verwendet >= self.ausdauer_50_limit and self.ausdauer_10_verwendet >= self.ausdauer_10_limit:
                 logger.info("Zombie-Bot: ALLE AUSDAUER-LIMITS ERREICHT - SKRIPT WIRD BEENDET!")
                 self.running = False
@@ -1217,12 +3147,9 @@ class GoldZombieController:
                 self.running = False
                 return "limit_erreicht"
             
-            timer_daten = self.extract_timer_from_region()
-            if timer_daten:
-                trupp_timer.set_timer(*timer_daten)
-            else:
-                logger.warning(f"Zombie-Bot: Konnte Timer für Trupp {trupp_timer.trupp_nummer} nicht lesen! Setze 1 Min Fallback.")
-                trupp_timer.set_timer(0, 1, 0)
+            # Nach dem Sammeln ist ein anderer Bildschirm zu sehen - gelesen wird der ruhige Bildschirm nach dem letzten Tap
+            _, timer_daten = self.lies_timer_bereich()
+            self.setze_trupp_timer(trupp_timer, timer_daten)
             
             self.truppen_deployed += 1
             logger.info(f"Zombie-Bot: 🚀 Truppe #{self.truppen_deployed} losgeschickt!")
@@ -1230,19 +3157,12 @@ class GoldZombieController:
         
         if not self.running: return "gestoppt"
 
-        timer_daten = self.extract_timer_from_region()
-        if timer_daten:
-            trupp_timer.set_timer(*timer_daten)
-        else:
-            logger.warning(f"Zombie-Bot: Konnte Timer für Trupp {trupp_timer.trupp_nummer} nicht lesen! Setze 1 Min Fallback.")
-            trupp_timer.set_timer(0, 1, 0)
+        self.setze_trupp_timer(trupp_timer, timer_daten)
         
         if not self.running: return "gestoppt"
         
-        time.sleep(0.5)
         logger.info("Zombie-Bot: Klicke auf Bestätigen...")
         self.tap(*self.BESTAETIGEN)
-        time.sleep(1)
         
         self.truppen_deployed += 1
         logger.info(f"Zombie-Bot: 🚀 Truppe #{self.truppen_deployed} losgeschickt!")
@@ -1287,79 +3207,71 @@ class GoldZombieController:
             self.schritte_1_bis_3()
             result = self.waehle_trupp_und_setze_timer(trupp_positions[trupp_num], trupp_timers[trupp_num])
             if result == "limit_erreicht":
-                self.stop()
-                return
+                self.running = False
             if not self.running:
+                self.close_ssh_tunnel()
+                self.status = "Gestoppt"
                 return
         
         logger.info("=" * 60)
         logger.info("Zombie-Bot: 🔄 ENDLOSSCHLEIFE GESTARTET")
         logger.info("=" * 60)
         
+        planer = self.TruppPlaner()
+        for timer in trupp_timers.values():
+            planer.plane(timer)
+        
         durchlauf = 0
         while self.running:
-            durchlauf += 1
-            self.status = f"Läuft (Durchlauf #{durchlauf})"
-            logger.info(f"\nZombie-Bot: Durchlauf #{durchlauf}")
-            
             if self.paused:
                 self.status = "Pausiert"
                 logger.info("Zombie-Bot: Pausiert...")
                 while self.paused and self.running:
-                    time.sleep(1)
-                if not self.running:
-                    break
+                    self.wake_event.wait()
+                    self.wake_event.clear()
+                continue
+            
+            # Bis der nächste Trupp fällig ist passiert nichts - kein Navigieren, kein Abfragen
+            warte_zeit = planer.sekunden_bis_naechster()
+            if warte_zeit is None:
+                logger.warning("Zombie-Bot: Kein Trupp ausgewählt - nichts zu tun")
+                break
+            if warte_zeit > 0:
+                trupp_num = planer.naechster().trupp_nummer
+                logger.info(f"Zombie-Bot: ⏳ Warte {warte_zeit:.0f}s auf Trupp {trupp_num}...")
+                self.status = f"Warte auf Trupp {trupp_num} ({warte_zeit:.0f}s)"
+                self.wake_event.wait(warte_zeit)
+                self.wake_event.clear()
+                continue
+            
+            durchlauf += 1
+            self.status = f"Läuft (Durchlauf #{durchlauf})"
+            logger.info(f"\nZombie-Bot: Durchlauf #{durchlauf}")
+            
+            verfuegbare_truppen = planer.entnimm_faellige()
+            if len(verfuegbare_truppen) > 1:
+                beste = TRUPP_POLICIES[self.trupp_policy](verfuegbare_truppen)
+                logger.info(f"Zombie-Bot: Wähle Trupp {beste.trupp_nummer} (Strategie {self.trupp_policy})")
+            else:
+                beste = verfuegbare_truppen[0]
+            for timer in verfuegbare_truppen:
+                if timer is not beste:
+                    planer.plane(timer)
             
             self.schritte_1_bis_3()
             if not self.running: break
             
-            verfuegbare_truppen = []
-            for trupp_num, timer in trupp_timers.items():
-                if timer.ist_verfuegbar():
-                    verfuegbare_truppen.append(trupp_num)
+            result = self.waehle_trupp_und_setze_timer(trupp_positions[beste.trupp_nummer], beste)
+            planer.plane(beste)
+            if result in ["limit_erreicht", "gestoppt"]:
+                break
             
             logger.info("Zombie-Bot: Status:")
             for trupp_num, timer in sorted(trupp_timers.items()):
                 status = '✅ Verfügbar' if timer.ist_verfuegbar() else f'❌ Noch {timer.zeit_bis_verfuegbar():.0f}s'
                 logger.info(f"  Trupp {trupp_num}: {status}")
             
-            if not self.running: break
-            
-            if verfuegbare_truppen:
-                if len(verfuegbare_truppen) > 1:
-                    beste_trupp = min(verfuegbare_truppen, key=lambda t: trupp_timers[t].get_letzte_cooldown_sekunden())
-                    logger.info(f"Zombie-Bot: Wähle Trupp {beste_trupp} (kürzester Cooldown)")
-                else:
-                    beste_trupp = verfuegbare_truppen[0]
-                
-                result = self.waehle_trupp_und_setze_timer(trupp_positions[beste_trupp], trupp_timers[beste_trupp])
-                
-                if result in ["limit_erreicht", "gestoppt"]:
-                    break
-            else:
-                naechste_trupp = min(trupp_timers.items(), key=lambda x: x[1].zeit_bis_verfuegbar())
-                trupp_num, timer = naechste_trupp
-                warte_zeit = timer.zeit_bis_verfuegbar()
-                
-                logger.info(f"Zombie-Bot: ⏳ Warte {warte_zeit:.0f}s auf Trupp {trupp_num}...")
-                self.status = f"Warte auf Trupp {trupp_num} ({warte_zeit:.0f}s)"
-                
-                wait_steps = int(warte_zeit * 2) + 2
-                for _ in range(wait_steps):
-                    if not self.running: break
-                    time.sleep(0.5)
-                
-                if not self.running: break
-                
-                result = self.waehle_trupp_und_setze_timer(trupp_positions[trupp_num], trupp_timers[trupp_num])
-                if result in ["limit_erreicht", "gestoppt"]:
-                    break
-            
-            if not self.running: break
-            
-            for _ in range(4):
-                if not self.running: break
-                time.sleep(0.5)
+            self.wake_event.wait(2)
         
         self.close_ssh_tunnel()
         self.status = "Gestoppt"
@@ -1373,6 +3285,7 @@ class GoldZombieController:
             if not self.running:
                 self.running = True
                 self.paused = False
+                self.wake_event.clear()
                 self.thread = threading.Thread(target=self.bot_loop, daemon=True)
                 self.thread.start()
                 logger.info("Zombie-Bot: Gestartet")
@@ -1382,6 +3295,7 @@ class GoldZombieController:
         if self.running:
             self.paused = not self.paused
             self.status = "Pausiert" if self.paused else "Läuft"
+            self.wake_event.set()
             logger.info(f"Zombie-Bot: {'Pausiert' if self.paused else 'Fortgesetzt'}")
     
     def stop(self):
@@ -1389,7 +3303,8 @@ class GoldZombieController:
         with self.lock:
             self.running = False
             self.paused = False
-            if self.thread:
+            self.wake_event.set()
+            if self.thread and self.thread is not threading.current_thread():
                 self.thread.join(timeout=5)
             self.status = "Gestoppt"
             logger.info("Zombie-Bot: Gestoppt")
@@ -1457,6 +3372,7 @@ def index():
 @app.route('/api/status')
 @login_required
 def api_status():
+    grabber = bot.frame_grabber  # Einmal lesen - der Bot-Thread kann ihn jederzeit auf None setzen
     remaining_time = None
     if bot.use_timer:
         remaining_seconds = bot.get_remaining_time_seconds()
@@ -1477,7 +3393,12 @@ def api_status():
         'current_user': bot.current_user,
         'maintenance_mode': bot.maintenance_mode,
         'timer_remaining': remaining_time,
-        'use_timer': bot.use_timer
+        'use_timer': bot.use_timer,
+        'capture_fps': round(grabber.fps(), 1) if grabber else None,
+        'list_screenshots': bot.list_screenshots,
+        'info_roundtrips_avoided': bot.info_roundtrips_avoided,
+        'known_rows': len(bot.known_rows),
+        'known_strengths': len(bot.seen_strengths)
     })
 
 @app.route('/api/start', methods=['POST'])
@@ -1524,6 +3445,7 @@ def api_settings():
             return jsonify({'error': 'User is blocked'}), 403
         
         data = request.json
+        filter_vorher = (bot.use_limit, bot.strength_limit, bot.use_server_filter, bot.server_number)
         bot.use_limit = data.get('use_limit', False)
         bot.strength_limit = float(data.get('strength_limit', 60))
         bot.use_server_filter = data.get('use_server_filter', False)
@@ -1532,6 +3454,16 @@ def api_settings():
         
         bot.use_timer = data.get('use_timer', False)
         bot.timer_duration_minutes = int(data.get('timer_duration', 60))
+        if data.get('screenshot_mode') in SCREENSHOT_MODES:
+            bot.screenshot_mode = data['screenshot_mode']
+        if 'use_frame_grabber' in data:
+            # Ein laufender Bot startet/stoppt die Aufnahme im nächsten Durchlauf (sync_frame_grabber)
+            bot.use_frame_grabber = bool(data['use_frame_grabber'])
+        if 'process_all_trucks' in data:
+            bot.process_all_trucks = bool(data['process_all_trucks'])
+        # Nur wenn sich Limit/Server geändert haben, müssen gemerkte Zeilen neu bewertet werden
+        if (bot.use_limit, bot.strength_limit, bot.use_server_filter, bot.server_number) != filter_vorher:
+            bot.known_rows.clear()
         
         user_data = users.get(current_user.username, {})
         if user_data.get('can_choose_share_mode', True):
@@ -1559,6 +3491,9 @@ def api_settings():
             'forced_share_mode': forced_mode,
             'use_timer': bot.use_timer,
             'timer_duration': bot.timer_duration_minutes,
+            'screenshot_mode': bot.screenshot_mode,
+            'use_frame_grabber': bot.use_frame_grabber,
+            'process_all_trucks': bot.process_all_trucks,
             'mode_change_request': mode_request.get('status', None),
             'requested_mode': mode_request.get('requested_mode', None)
         })
@@ -1580,6 +3515,8 @@ def api_reset_stats():
     bot.trucks_processed = 0
     bot.trucks_shared = 0
     bot.trucks_skipped = 0
+    bot.list_screenshots = 0
+    bot.info_roundtrips_avoided = 0
     log_audit(current_user.username, 'Reset LKW-Bot Statistics', '')
     return jsonify({'success': True})
 
@@ -1744,41 +3681,105 @@ def api_admin_reject_mode_change(username):
 @app.route('/api/admin/stats')
 @login_required
 def api_admin_stats():
-    """ API für LKW-Statistiken """
+    """ API für LKW-Statistiken (Zeitraum start/end, Seiten mit offset/limit) """
     if current_user.role != 'admin': return jsonify({'error': 'Unauthorized'}), 403
     start_str = request.args.get('start', '')
     end_str = request.args.get('end', '')
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', type=int)
+    try:
+        start = stats_zeitpunkt(start_str) if start_str else None
+        end = stats_zeitpunkt(end_str) if end_str else None
+    except ValueError:
+        return jsonify({'error': 'Ungültiger Zeitraum'}), 400
     
-    if os.path.exists(LKW_STATS_FILE):
-        try:
-            with open(LKW_STATS_FILE, 'r') as f:
-                content = f.read().strip()
-                all_stats = json.loads(content) if content else []
-        except (json.JSONDecodeError, ValueError):
-            all_stats = []
-    else:
-        all_stats = []
+    total, trucks = truck_stats.query(start, end, offset, limit)
+    return jsonify({'trucks': trucks, 'total': total, 'offset': offset, 'limit': limit})
+
+def stats_export_rows(records, fmt):
+    """Export-Text in Blöcken von etwa LKW_STATS_EXPORT_CHUNK Bytes (CSV mit Kopfzeile oder NDJSON)"""
+    puffer = io.StringIO()
+    writer = csv.writer(puffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(['timestamp', 'strength', 'server', 'user'])
+    for record in records:
+        if writer:
+            writer.writerow([record.get('timestamp'), record.get('strength'), record.get('server'), record.get('user') or ''])
+        else:
+            puffer.write(json.dumps(record, ensure_ascii=False) + '\n')
+        if puffer.tell() >= LKW_STATS_EXPORT_CHUNK:
+            yield puffer.getvalue().encode('utf-8')
+            puffer.seek(0)
+            puffer.truncate()
+    if puffer.tell():
+        yield puffer.getvalue().encode('utf-8')
+
+def gzip_stream(chunks):
+    """Komprimiert einen Strom von Blöcken fortlaufend (gzip-Format)"""
+    komprimierer = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        daten = komprimierer.compress(chunk)
+        if daten:
+            yield daten
+    yield komprimierer.flush()
+
+@app.route('/api/admin/stats/export')
+@login_required
+def api_admin_stats_export():
+    """ Export der LKW-Statistik als CSV oder NDJSON, gestreamt (optional gzip) """
+    if current_user.role != 'admin': return jsonify({'error': 'Unauthorized'}), 403
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'error': 'Ungültiges Format (csv oder ndjson)'}), 400
+    start_str = request.args.get('start', '')
+    end_str = request.args.get('end', '')
+    try:
+        start = stats_zeitpunkt(start_str) if start_str else None
+        end = stats_zeitpunkt(end_str) if end_str else None
+    except ValueError:
+        return jsonify({'error': 'Ungültiger Zeitraum'}), 400
+    server = request.args.get('server')
+    user = request.args.get('user')
+    komprimiert = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
     
-    filtered_stats = []
-    if not start_str and not end_str:
-        filtered_stats = all_stats
-    else:
-        for stat in all_stats:
-            try:
-                stat_time = datetime.fromisoformat(stat['timestamp']).replace(tzinfo=None)
-                include = True
-                if start_str:
-                    start_time = datetime.fromisoformat(start_str).replace(tzinfo=None)
-                    if stat_time < start_time: include = False
-                if end_str:
-                    end_time = datetime.fromisoformat(end_str).replace(tzinfo=None)
-                    if stat_time > end_time: include = False
-                if include:
-                    filtered_stats.append(stat)
-            except Exception as e:
-                logger.warning(f"LKW-Bot: Fehler beim Filtern der Statistik-Zeit: {e}")
+    def records():
+        for record in truck_stats.iter_range(start, end):
+            if server and str(record.get('server')) != server:
                 continue
-    return jsonify({'trucks': filtered_stats})
+            if user and record.get('user') != user:
+                continue
+            yield record
+    
+    body = stats_export_rows(records(), fmt)
+    dateiname = f"lkw_stats_{start_str[:10] or 'anfang'}_{end_str[:10] or 'heute'}.{fmt}"
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    if komprimiert:
+        body = gzip_stream(body)
+        dateiname += '.gz'
+        mimetype = 'application/gzip'
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{dateiname}"'})
+
+@app.route('/api/admin/stats/aggregate')
+@login_required
+def api_admin_stats_aggregate():
+    """ Fertige Histogramme für das Statistik-Dashboard (statt aller Rohdaten) """
+    if current_user.role != 'admin': return jsonify({'error': 'Unauthorized'}), 403
+    return jsonify(truck_stats.aggregate(request.args.get('start') or None, request.args.get('end') or None))
+
+@app.route('/api/admin/templates')
+@login_required
+def api_admin_templates():
+    """ Trefferstatistik der LKW-Templates """
+    if current_user.role != 'admin': return jsonify({'error': 'Unauthorized'}), 403
+    return jsonify({'templates': lkw_templates.stats(), 'score_distribution': lkw_templates.score_distribution()})
+
+@app.route('/api/admin/ocr')
+@login_required
+def api_admin_ocr():
+    """ Startzeit und Latenz der OCR-Worker """
+    if current_user.role != 'admin': return jsonify({'error': 'Unauthorized'}), 403
+    return jsonify(dict(ocr_service.metrics(), glyphs=glyph_classifier.stats()))
 
 @app.route('/api/admin/audit_log')
 @login_required
@@ -1863,6 +3864,10 @@ def api_gold_zombies_settings():
         zombie_bot.ausdauer_50_limit = int(data.get('stamina_50', 0))
         zombie_bot.ausdauer_10_limit = int(data.get('stamina_10', 0))
         zombie_bot.unbegrenzt_mode = data.get('unlimited', False)
+        if data.get('screenshot_mode') in SCREENSHOT_MODES:
+            zombie_bot.screenshot_mode = data['screenshot_mode']
+        if data.get('trupp_policy') in TRUPP_POLICIES:
+            zombie_bot.trupp_policy = data['trupp_policy']
         
         ssh_command = data.get('ssh_command', '').strip()
         ssh_password = data.get('ssh_password', '').strip()
@@ -1902,6 +3907,9 @@ def api_gold_zombies_settings():
             'stamina_50': zombie_bot.ausdauer_50_limit,
             'stamina_10': zombie_bot.ausdauer_10_limit,
             'unlimited': zombie_bot.unbegrenzt_mode,
+            'screenshot_mode': zombie_bot.screenshot_mode,
+            'trupp_policy': zombie_bot.trupp_policy,
+            'trupp_policies': list(TRUPP_POLICIES),
             'ssh_command': ssh_config.get('ssh_command', ''),
             'ssh_password': ssh_config.get('ssh_password', ''),
             'local_adb_port': ssh_config.get('local_adb_port'),
@@ -34,6 +34,9 @@ sudo apt-get install -y \
     tesseract-ocr \
     tesseract-ocr-eng \
     tesseract-ocr-deu \
+    libtesseract-dev \
+    libleptonica-dev \
+    pkg-config \
     libatlas-base-dev \
     libhdf5-dev \
     libhdf5-serial-dev \
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simulator für die Trupp-Auswahl des Gold-Zombie-Bots
+
+Spielt TruppTimer, TruppPlaner und die Strategien aus TRUPP_POLICIES (lkw_bot_web.py) auf
+einer virtuellen Uhr durch - tausende Stunden in Sekunden. Cooldowns kommen entweder aus
+einem Log des Live-Bots ('Zombie-Bot: Trupp N Timer: hh:mm:ss') oder werden synthetisch
+erzeugt. Ausdauer verhält sich wie im Bot: reicht sie nicht, werden 50er und 10er gesammelt.
+Jeder Einsatz belegt den Bot wie im Live-Betrieb: Schritte 1-3, Trupp wählen und Timer lesen,
+gegebenenfalls Ausdauer sammeln und die Pause am Ende der Schleife. Trupps, die in dieser Zeit
+frei werden, warten - erst dadurch sind oft mehrere gleichzeitig fällig und die Strategie entscheidet.
+Ohne --items-50/--items-10 ist der Vorrat unbegrenzt (wie unbegrenzt_mode), damit die Strategien
+über die ganze Laufzeit verglichen werden; mit Limit endet der Lauf, sobald der Vorrat leer ist.
+
+Aufruf:
+    python3 simulate_zombie.py --hours 2000
+    python3 simulate_zombie.py --trace-log lkw-bot.log --troops 2,3 --items-50 10 --items-10 10
+    python3 simulate_zombie.py --cooldown 2:300:60 --cooldown 3:420:90
+    python3 simulate_zombie.py --troops 1,2,3 --troop-cost 1:8 --troop-cost 3:15
+"""
+
+import argparse
+import logging
+import random
+import re
+import time
+from datetime import datetime, timedelta
+
+from lkw_bot_web import TRUPP_POLICIES, GoldZombieController
+
+TRACE_PATTERN = re.compile(r'Zombie-Bot: Trupp (\d+) Timer: (\d+):(\d{2}):(\d{2})')
+DEFAULT_COOLDOWNS = {1: (240, 60), 2: (300, 60), 3: (420, 90)}  # Trupp: (Mittel, Streuung) in Sekunden
+# Belegzeiten des Bots in Sekunden - Obergrenzen aus GoldZombieController, mit wait_for_screen oft kürzer
+STEPS_TIME = 3 + 5 + 3       # schritte_1_bis_3
+SELECT_TIME = 3              # Trupp antippen, Timer-Bereich lesen
+STAMINA_TIME = 5 * 3         # sammle_ausdauer: Bestätigen, 50er, 10er, Schließen, Bestätigen
+LOOP_WAIT = 2                # wake_event.wait(2) am Ende jedes Durchlaufs
+
+
+class VirtualClock:
+    def __init__(self):
+        self.start = self.jetzt = datetime(2024, 1, 1)
+
+    def now(self):
+        return self.jetzt
+
+    def advance(self, sekunden):
+        self.jetzt += timedelta(seconds=sekunden)
+
+    def elapsed(self):
+        return (self.jetzt - self.start).total_seconds()
+
+
+def load_trace(path):
+    """Liest aufgezeichnete Cooldowns pro Trupp aus dem Bot-Log"""
+    trace = {}
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            match = TRACE_PATTERN.search(line)
+            if match:
+                trupp, h, m, s = (int(g) for g in match.groups())
+                trace.setdefault(trupp, []).append(h * 3600 + m * 60 + s)
+    return trace
+
+
+class CooldownSource:
+    """Liefert den nächsten Cooldown eines Trupps - aus der Aufzeichnung (der Reihe nach) oder zufällig"""
+
+    def __init__(self, trace, synthetic, seed):
+        self.trace = trace
+        self.pooled = [c for values in trace.values() for c in values]
+        self.synthetic = synthetic
+        self.random = random.Random(seed)
+        self.index = {}
+
+    def next(self, trupp):
+        samples = self.trace.get(trupp) or self.pooled
+        if samples:
+            i = self.index.get(trupp, 0)
+            self.index[trupp] = i + 1
+            return samples[i % len(samples)]
+        mittel, streuung = self.synthetic.get(trupp, DEFAULT_COOLDOWNS[2])
+        return max(1, int(self.random.gauss(mittel, streuung)))
+
+
+def simulate(policy_name, args, cooldowns):
+    uhr = VirtualClock()
+    policy = TRUPP_POLICIES[policy_name]
+    planer = GoldZombieController.TruppPlaner(uhr.now)
+    for trupp in args.troops:
+        planer.plane(GoldZombieController.TruppTimer(trupp, uhr.now))
+
+    ende = args.hours * 3600
+    ausdauer = float(args.stamina_start)
+    letzte_regeneration = 0.0
+    deploys = verbraucht = items_50 = items_10 = 0
+    wahlen = 0
+    limit_erreicht = False
+    schedule = []
+
+    while True:
+        uhr.advance(planer.sekunden_bis_naechster())
+        if uhr.elapsed() >= ende:
+            break
+        faellige = planer.entnimm_faellige()
+        if len(faellige) > 1:
+            beste = policy(faellige)
+            wahlen += 1
+        else:
+            beste = faellige[0]
+        for timer in faellige:
+            if timer is not beste:
+                planer.plane(timer)
+        schedule.append((uhr.elapsed(), beste.trupp_nummer))
+        kosten = args.troop_cost.get(beste.trupp_nummer, args.cost)
+
+        uhr.advance(args.steps_time + args.select_time)
+        jetzt = uhr.elapsed()
+        if ausdauer < args.stamina_max:
+            ausdauer = min(args.stamina_max, ausdauer + (jetzt - letzte_regeneration) * args.regen_per_hour / 3600)
+        letzte_regeneration = jetzt
+
+        if ausdauer < kosten:
+            uhr.advance(args.stamina_time)
+            # Wie sammle_ausdauer: 50er und 10er in einem Durchgang, solange das Limit es zulässt
+            gesammelt = False
+            if args.unlimited or items_50 < args.items_50:
+                items_50 += 1
+                ausdauer += 50
+                gesammelt = True
+            if args.unlimited or items_10 < args.items_10:
+                items_10 += 1
+                ausdauer += 10
+                gesammelt = True
+            if not gesammelt or ausdauer < kosten:
+                limit_erreicht = True
+                break
+
+        ausdauer -= kosten
+        verbraucht += kosten
+        sekunden = cooldowns.next(beste.trupp_nummer)
+        beste.set_timer(sekunden // 3600, sekunden % 3600 // 60, sekunden % 60)
+        planer.plane(beste)
+        deploys += 1
+        uhr.advance(args.loop_wait)
+
+    stunden = min(uhr.elapsed(), ende) / 3600
+    return {
+        'policy': policy_name,
+        'deploys': deploys,
+        'deploys_per_hour': deploys / stunden if stunden else 0.0,
+        'choices': wahlen,
+        'per_troop': {t: sum(1 for _, trupp in schedule if trupp == t) for t in args.troops},
+        'stamina_used': verbraucht,
+        'items_50': items_50,
+        'items_10': items_10,
+        'hours': stunden,
+        'limit_reached': limit_erreicht,
+        'schedule': schedule,
+    }
+
+
+def parse_cooldown(value):
+    trupp, mittel, streuung = (int(v) for v in value.split(':'))
+    return trupp, (mittel, streuung)
+
+
+def parse_troop_cost(value):
+    trupp, kosten = value.split(':')
+    return int(trupp), float(kosten)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hours', type=float, default=1000, help='Simulierte Stunden pro Strategie')
+    parser.add_argument('--troops', default='2,3', help='Aktive Trupps, z.B. 1,2,3')
+    parser.add_argument('--policy', action='append', choices=sorted(TRUPP_POLICIES),
+                        help='Nur diese Strategien vergleichen (mehrfach möglich)')
+    parser.add_argument('--trace-log', help='Bot-Log mit aufgezeichneten Trupp-Timern')
+    parser.add_argument('--cooldown', action='append', type=parse_cooldown, default=[],
+                        help='Synthetischer Cooldown trupp:mittel:streuung in Sekunden')
+    parser.add_argument('--steps-time', type=float, default=STEPS_TIME, help='Sekunden für Schritte 1-3')
+    parser.add_argument('--select-time', type=float, default=SELECT_TIME, help='Sekunden für Trupp-Auswahl + Timer lesen')
+    parser.add_argument('--stamina-time', type=float, default=STAMINA_TIME, help='Sekunden für Ausdauer sammeln')
+    parser.add_argument('--loop-wait', type=float, default=LOOP_WAIT, help='Pause am Ende jedes Durchlaufs')
+    parser.add_argument('--cost', type=float, default=10, help='Ausdauer pro Einsatz')
+    parser.add_argument('--troop-cost', action='append', type=parse_troop_cost, default=[],
+                        help='Abweichende Ausdauer pro Einsatz trupp:kosten')
+    parser.add_argument('--stamina-start', type=float, default=100)
+    parser.add_argument('--stamina-max', type=float, default=100)
+    parser.add_argument('--regen-per-hour', type=float, default=12, help='Natürliche Regeneration pro Stunde')
+    parser.add_argument('--items-50', type=int, help='Limit 50er-Ausdauer (wie ausdauer_50_limit, Standard: unbegrenzt)')
+    parser.add_argument('--items-10', type=int, help='Limit 10er-Ausdauer (wie ausdauer_10_limit, Standard: unbegrenzt)')
+    parser.add_argument('--unlimited', action='store_true', help='Limits ignorieren (wie unbegrenzt_mode)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+    args.troops = [int(t) for t in args.troops.split(',')]
+    args.troop_cost = dict(args.troop_cost)
+    # Limit nur, wenn ausdrücklich angegeben - sonst endet jeder Lauf nach wenigen Stunden gleich
+    args.unlimited = args.unlimited or (args.items_50 is None and args.items_10 is None)
+    args.items_50 = args.items_50 or 0
+    args.items_10 = args.items_10 or 0
+    return args
+
+
+def main():
+    args = parse_args()
+
+    # Jeder gesetzte Timer loggt sonst eine Zeile
+    logging.getLogger('lkw_bot_web').setLevel(logging.WARNING)
+
+    trace = load_trace(args.trace_log) if args.trace_log else {}
+    if args.trace_log:
+        print(f"Aufzeichnung: {', '.join(f'Trupp {t}: {len(v)} Cooldowns' for t, v in sorted(trace.items())) or 'leer'}")
+    synthetic = {**DEFAULT_COOLDOWNS, **dict(args.cooldown)}
+
+    print(f"{'Strategie':<22} {'Einsätze':>9} {'pro Std.':>9} {'Wahlen':>7} {'pro Trupp':>18} {'Ausdauer':>9} "
+          f"{'50er':>5} {'10er':>5} {'Stunden':>9} {'Limit':>6} {'Dauer':>7}")
+    for policy_name in args.policy or sorted(TRUPP_POLICIES):
+        start = time.perf_counter()
+        # Gleiche Cooldown-Folge für jede Strategie
+        result = simulate(policy_name, args, CooldownSource(trace, synthetic, args.seed))
+        dauer = time.perf_counter() - start
+        pro_trupp = '/'.join(str(n) for _, n in sorted(result['per_troop'].items()))
+        print(f"{result['policy']:<22} {result['deploys']:9d} {result['deploys_per_hour']:9.2f} "
+              f"{result['choices']:7d} {pro_trupp:>18} {result['stamina_used']:9.0f} {result['items_50']:5d} {result['items_10']:5d} "
+              f"{result['hours']:9.1f} {'ja' if result['limit_reached'] else 'nein':>6} {dauer:6.2f}s")
+
+
+if __name__ == '__main__':
+    main()
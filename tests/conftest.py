@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Gemeinsame Einrichtung für die Tests der reinen Logik (ohne ADB/Gerät).
+
+lkw_bot_web legt beim Import Dateien im Arbeitsverzeichnis an (users.json, Log, truck_stats/),
+deshalb wird vorher in ein temporäres Verzeichnis gewechselt.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp(prefix='lkw_bot_tests_'))
+
+
+class FakeClock:
+    """Ersatz für time.time() - Tests stellen die Uhr selbst vor"""
+
+    def __init__(self, start=1_000_000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    uhr = FakeClock()
+    monkeypatch.setattr('time.time', uhr)
+    return uhr
+
+
+def berlin_day(days_ago):
+    """Berliner Datum (YYYY-MM-DD) vor days_ago Tagen"""
+    return (datetime.now(pytz.timezone('Europe/Berlin')) - timedelta(days=days_ago)).date().isoformat()
+
+
+def truck(day, zeit='10:00:00', strength='12,5M', server='49', user='admin', offset='+02:00'):
+    return {'strength': strength, 'server': server, 'timestamp': f"{day}T{zeit}{offset}", 'user': user}
+
+
+def write_segment(directory, day, records):
+    """Schreibt eine Tagesdatei so, wie TruckStatsStore.append sie anlegt"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{day}.jsonl"), 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
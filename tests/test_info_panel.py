@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+import lkw_bot_web
+from lkw_bot_web import SERVER_BOX, STAERKE_BOX, InfoPanelReading, OcrResult
+
+
+class GlyphStub:
+    """Glyphen-Bank mit festen Ergebnissen pro Ausschnitt-Breite (Stärke- oder Server-Box)"""
+
+    def __init__(self, staerke, server):
+        self.results = {STAERKE_BOX[2] - STAERKE_BOX[0]: staerke, SERVER_BOX[2] - SERVER_BOX[0]: server}
+
+    def read(self, image):
+        return self.results[image.size[0]]
+
+
+@pytest.fixture
+def ocr_jobs(monkeypatch):
+    jobs = []
+
+    def submit(image, name):
+        jobs.append(name)
+        future = Future()
+        future.set_result(OcrResult('#49' if name == 'server' else '12,5M', 95.0))
+        return future
+
+    monkeypatch.setattr(lkw_bot_web, 'submit_pipeline', submit)
+    return jobs
+
+
+def reading(monkeypatch, staerke, server):
+    monkeypatch.setattr(lkw_bot_web, 'glyph_classifier', GlyphStub(staerke, server))
+    return InfoPanelReading(np.zeros((1280, 720, 3), dtype=np.uint8))
+
+
+@pytest.mark.parametrize('text', ['49', '#49'])
+def test_plausible_glyph_server_skips_ocr(monkeypatch, ocr_jobs, text):
+    info = reading(monkeypatch, '30,1M', text)
+    assert ocr_jobs == []
+    assert info.server == '49'
+    assert info.ocr_calls == 0
+
+
+@pytest.mark.parametrize('text', ['4I', 'M9', '#', ''])
+def test_implausible_glyph_server_falls_back_to_ocr(monkeypatch, ocr_jobs, text):
+    info = reading(monkeypatch, '30,1M', text)
+    assert ocr_jobs == ['server']
+    assert info.server_text == '#49'
+    assert info.server_passt('49')
+
+
+def test_glyph_strength_without_unit_falls_back_to_ocr(monkeypatch, ocr_jobs):
+    info = reading(monkeypatch, '301', '49')
+    assert ocr_jobs == ['staerke']
+    assert info.wert == 12.5
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from lkw_bot_web import NMS_OVERLAP, non_max_suppression
+
+
+def boxes(*rows):
+    return np.array(rows, dtype=np.int32)
+
+
+def test_overlapping_boxes_keep_best_score():
+    keep = non_max_suppression(boxes((0, 0, 10, 10), (1, 1, 11, 11), (2, 0, 12, 10)), np.array([0.5, 0.9, 0.7]))
+    assert list(keep) == [1]
+
+
+def test_disjoint_boxes_all_kept_sorted_by_score():
+    keep = non_max_suppression(boxes((0, 0, 10, 10), (100, 0, 110, 10), (0, 100, 10, 110)), np.array([0.4, 0.8, 0.6]))
+    assert list(keep) == [1, 2, 0]
+
+
+def test_overlap_exactly_at_threshold_is_kept():
+    # Zwei 10x10-Boxen, um d verschoben: IoU = (10 - d) / (10 + d)
+    d = 10 * (1 - NMS_OVERLAP) / (1 + NMS_OVERLAP)
+    keep = non_max_suppression(np.array([(0, 0, 10, 10), (d, 0, 10 + d, 10)], dtype=np.float32), np.array([0.9, 0.8]))
+    assert list(keep) == [0, 1]
+
+
+def test_overlap_above_threshold_is_suppressed():
+    keep = non_max_suppression(boxes((0, 0, 10, 10), (3, 0, 13, 10)), np.array([0.9, 0.8]), overlap=0.5)
+    assert list(keep) == [0]
+
+
+def test_suppressed_box_does_not_suppress_others():
+    # B überlappt A und C, A und C nicht miteinander: A gewinnt gegen B, C bleibt
+    keep = non_max_suppression(boxes((0, 0, 10, 10), (5, 0, 15, 10), (10, 0, 20, 10)), np.array([0.9, 0.8, 0.7]),
+                               overlap=0.3)
+    assert list(keep) == [0, 2]
+
+
+def test_equal_scores_keep_first_box():
+    keep = non_max_suppression(boxes((0, 0, 10, 10), (1, 0, 11, 10)), np.array([0.5, 0.5]))
+    assert list(keep) == [0]
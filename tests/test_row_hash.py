@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import cv2
+import numpy as np
+
+from lkw_bot_web import LIST_HASH_MAX_DISTANCE, LIST_ROW_HEIGHT, LIST_ROW_OFFSET, RowHashIndex, TemplateMatch, \
+    list_row_box, row_hash
+
+
+def list_frame(text, channels=3, noise=0):
+    """720x1280-Frame mit einer Listenzeile (Text) bei y=400"""
+    frame = np.full((1280, 720, channels), 40, dtype=np.uint8)
+    cv2.putText(frame, text, (40, 460), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (230,) * channels, 3)
+    if noise:
+        rng = np.random.default_rng(1)
+        frame = np.clip(frame.astype(np.int16) + rng.integers(-noise, noise + 1, frame.shape), 0, 255).astype(np.uint8)
+    return frame
+
+
+BOX = (0, 400, 720, 520)
+
+
+def test_list_row_box_is_clamped_to_frame():
+    frame = np.zeros((1280, 720, 3), dtype=np.uint8)
+    assert list_row_box(frame, TemplateMatch(100, 500, 0.9, 't')) == (0, 500 - LIST_ROW_OFFSET, 720, 500 - LIST_ROW_OFFSET + LIST_ROW_HEIGHT)
+    assert list_row_box(frame, TemplateMatch(100, 10, 0.9, 't'))[1] == 0
+    assert list_row_box(frame, TemplateMatch(100, 1275, 0.9, 't'))[3] == 1280
+
+
+def test_same_row_hashes_equal_despite_noise():
+    a = row_hash(list_frame('Server 49  12,5M'), BOX)
+    b = row_hash(list_frame('Server 49  12,5M', noise=3), BOX)
+    assert bin(a ^ b).count('1') <= LIST_HASH_MAX_DISTANCE
+
+
+def test_different_digit_changes_hash():
+    a = row_hash(list_frame('Server 49  12,5M'), BOX)
+    b = row_hash(list_frame('Server 49  12,8M'), BOX)
+    assert bin(a ^ b).count('1') > LIST_HASH_MAX_DISTANCE
+
+
+def test_flat_region_hashes_to_zero():
+    assert row_hash(np.full((1280, 720, 3), 90, dtype=np.uint8), BOX) == 0
+
+
+def test_rgba_and_bgr_frames_hash_alike():
+    bgr = list_frame('Server 49  12,5M')
+    rgba = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGBA)
+    assert row_hash(bgr, BOX) == row_hash(rgba, BOX)
+
+
+def test_index_matches_within_distance(clock):
+    index = RowHashIndex(max_distance=2)
+    index.add(0b1011, ttl=60)
+    assert index.contains(0b1011)
+    assert index.contains(0b1000)       # 2 Bits
+    assert not index.contains(0b0100)   # 4 Bits
+
+
+def test_index_entries_expire(clock):
+    index = RowHashIndex()
+    index.add(1, ttl=60)
+    clock.advance(59)
+    assert index.contains(1)
+    clock.advance(1)
+    assert not index.contains(1)
+    assert len(index) == 0
+
+
+def test_index_readd_extends_ttl(clock):
+    index = RowHashIndex()
+    index.add(1, ttl=60)
+    clock.advance(50)
+    index.add(1, ttl=60)
+    clock.advance(50)
+    assert index.contains(1)
+
+
+def test_index_clear():
+    index = RowHashIndex()
+    index.add(1, ttl=60)
+    index.clear()
+    assert not index.contains(1)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import os
+
+from lkw_bot_web import SeenStrengthSet, staerke_schluessel
+
+
+def test_key_normalises_value():
+    assert staerke_schluessel(12.5, '49') == staerke_schluessel(12.50, '49') == '12.5@49'
+    assert staerke_schluessel(12.5, '49') != staerke_schluessel(12.5, '50')
+
+
+def test_key_without_server_is_strength_only():
+    assert staerke_schluessel(12.50) == '12.5'
+
+
+def test_enthaelt_wert_ignores_server(tmp_path, clock):
+    seen = SeenStrengthSet(str(tmp_path / 'staerken.txt'))
+    seen.add('12.5@49', ttl=900)
+    seen.add('30', ttl=60)
+    assert seen.enthaelt_wert(12.5)
+    assert seen.enthaelt_wert(30.0)
+    assert not seen.enthaelt_wert(1.25)  # '1.25' ist kein Präfix von '12.5@49'
+    clock.advance(61)
+    assert not seen.enthaelt_wert(30.0)
+
+
+def test_entry_expires_after_ttl(tmp_path, clock):
+    seen = SeenStrengthSet(str(tmp_path / 'staerken.txt'))
+    seen.add('12.5@49', ttl=900)
+    clock.advance(899)
+    assert '12.5@49' in seen
+    clock.advance(1)
+    assert '12.5@49' not in seen
+    assert len(seen) == 0
+
+
+def test_journal_is_replayed_on_load(tmp_path, clock):
+    path = str(tmp_path / 'staerken.txt')
+    seen = SeenStrengthSet(path)
+    seen.add('12.5@49', ttl=900)
+    seen.add('30@49', ttl=60)
+    seen.add('12.5@49', ttl=1800)  # Spätere Zeile gewinnt
+    clock.advance(120)
+
+    wieder = SeenStrengthSet(path)
+    assert '12.5@49' in wieder
+    assert '30@49' not in wieder
+    clock.advance(1000)
+    assert '12.5@49' in wieder
+
+
+def test_load_does_not_rewrite_file(tmp_path, clock):
+    path = tmp_path / 'staerken.txt'
+    inhalt = f"/ 58,6M\nj 41,2M\n{clock() - 10:.0f}\t1@49\n{clock() + 600:.0f}\t2@49\n"
+    path.write_text(inhalt, encoding='utf-8')
+    mtime = os.stat(path).st_mtime_ns
+
+    seen = SeenStrengthSet(str(path))
+    assert '2@49' in seen
+    assert '1@49' not in seen
+    assert len(seen) == 3
+    assert path.read_text(encoding='utf-8') == inhalt
+    assert os.stat(path).st_mtime_ns == mtime
+
+
+def test_legacy_lines_are_migrated_without_server(tmp_path, clock):
+    path = tmp_path / 'staerken.txt'
+    path.write_bytes(b"/ 58,6M\r\nj 41,2M\r\nkein Text\r\n")
+    seen = SeenStrengthSet(str(path), legacy_ttl=900)
+
+    assert '58.6' in seen and '41.2' in seen
+    assert seen.enthaelt_wert(58.6)
+    assert len(seen) == 2
+    clock.advance(900)
+    assert '58.6' not in seen
+
+
+def test_compact_drops_expired_and_rewrites_legacy_lines(tmp_path, clock):
+    path = tmp_path / 'staerken.txt'
+    path.write_text(f"/ 58,6M\n{clock() + 600:.0f}\t2@49\n", encoding='utf-8')
+    seen = SeenStrengthSet(str(path), legacy_ttl=300)
+    seen.add('3@49', ttl=60)
+    clock.advance(61)
+
+    assert seen.compact() == 2
+    assert path.read_text(encoding='utf-8') == f"{clock() - 61 + 300:.0f}\t58.6\n{clock() - 61 + 600:.0f}\t2@49\n"
+    assert not os.path.exists(str(path) + '.tmp')
+
+
+def test_missing_file_is_empty(tmp_path):
+    seen = SeenStrengthSet(str(tmp_path / 'gibt_es_nicht.txt'))
+    assert len(seen) == 0
+    assert not (tmp_path / 'gibt_es_nicht.txt').exists()
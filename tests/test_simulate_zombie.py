@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from simulate_zombie import DEFAULT_COOLDOWNS, CooldownSource, parse_args, simulate
+
+from lkw_bot_web import TRUPP_POLICIES
+
+
+def run(policy, *argv):
+    args = parse_args(list(argv))
+    synthetic = {**DEFAULT_COOLDOWNS, **dict(args.cooldown)}
+    return simulate(policy, args, CooldownSource({}, synthetic, args.seed))
+
+
+# Kurze Cooldowns gegenüber der Belegzeit pro Einsatz: oft sind mehrere Trupps gleichzeitig frei
+KNAPP = ('--hours', '20', '--troops', '1,2,3', '--cooldown', '1:40:10', '--cooldown', '2:60:10',
+         '--cooldown', '3:90:20', '--troop-cost', '3:15')
+
+
+def test_busy_time_spaces_deploys():
+    result = run('reihenfolge', '--hours', '1', '--troops', '1', '--cooldown', '1:5:0')
+    # Schritte 1-3 (11s) + Auswahl (3s), dann Cooldown (5s, die Schleifenpause läuft darin mit)
+    zeiten = [t for t, _ in result['schedule']]
+    assert zeiten[1] - zeiten[0] == 11 + 3 + 5
+    assert max(b - a for a, b in zip(zeiten, zeiten[1:])) == 11 + 3 + 15 + 5  # mit Ausdauer sammeln
+
+
+def test_policies_are_consulted_when_troops_collide():
+    result = run('kuerzester_cooldown', *KNAPP)
+    assert result['choices'] > result['deploys'] // 20
+
+
+def test_policies_produce_different_schedules_and_throughput():
+    ergebnisse = {name: run(name, *KNAPP) for name in TRUPP_POLICIES}
+    assert len({tuple(r['schedule']) for r in ergebnisse.values()}) > 1
+    assert len({r['deploys'] for r in ergebnisse.values()}) > 1
+    assert ergebnisse['kuerzester_cooldown']['deploys'] > ergebnisse['laengster_cooldown']['deploys']
+
+
+def test_troop_cost_is_charged_per_troop():
+    result = run('reihenfolge', '--hours', '10', '--troops', '2,3', '--troop-cost', '3:15')
+    assert result['stamina_used'] == result['per_troop'][2] * 10 + result['per_troop'][3] * 15
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from conftest import berlin_day, truck
+from lkw_bot_web import LKW_STATS_BINS, StatsRollup, TruckStatsStore, statistik_staerke
+
+
+def test_statistik_staerke_parses_stored_text():
+    assert statistik_staerke('12,5M') == 12.5
+    assert statistik_staerke('105M') == 105.0
+    assert statistik_staerke('??') is None
+
+
+def test_rollup_buckets_and_extremes():
+    rollup = StatsRollup()
+    for staerke in ('0,5M', '9,9M', '10M', '99,9M', '100M', '250M', 'kaputt'):
+        rollup.add(truck('2026-01-01', strength=staerke))
+    assert rollup.count == 7
+    assert rollup.strength_count == 6
+    assert rollup.strength_min == 0.5 and rollup.strength_max == 250.0
+    counts = dict(zip(LKW_STATS_BINS, rollup.buckets))
+    assert counts[0] == 2 and counts[10] == 1 and counts[90] == 1 and counts[100] == 2
+
+
+def test_aggregate_is_updated_on_append(tmp_path):
+    s = TruckStatsStore(str(tmp_path / 'stats'), legacy_file=None)
+    heute, gestern = berlin_day(0), berlin_day(1)
+    s.append(truck(gestern, '23:30:00', '20M', '1', 'a'))
+    s.append(truck(heute, '08:15:00', '40M', '2', 'b'))
+    s.append(truck(heute, '08:45:00', '60M', '2', None))
+
+    result = s.aggregate()
+    assert result['total'] == 3
+    assert result['avg_strength'] == 40.0
+    assert result['daily'] == {gestern: 1, heute: 2}
+    assert result['hourly'][8] == 2 and result['hourly'][23] == 1
+    assert result['servers'] == {'2': 2, '1': 1}
+    assert result['users'] == {'a': 1, 'b': 1, '-': 1}
+
+
+def test_aggregate_filters_whole_hours(tmp_path):
+    s = TruckStatsStore(str(tmp_path / 'stats'), legacy_file=None)
+    heute = berlin_day(0)
+    s.append(truck(heute, '07:59:59'))
+    s.append(truck(heute, '08:00:00'))
+    s.append(truck(heute, '08:59:59'))
+    s.append(truck(heute, '09:00:00'))
+    assert s.aggregate(f"{heute}T08:30:00", f"{heute}T08:30:00")['total'] == 2
+    assert s.aggregate(f"{heute}T08:00:00", None)['total'] == 3
+
+
+def test_aggregate_matches_rebuild_from_segments(tmp_path):
+    s = TruckStatsStore(str(tmp_path / 'stats'), legacy_file=None)
+    for i in range(5):
+        s.append(truck(berlin_day(i % 3), f"{10 + i}:00:00", f"{10 * i},5M", str(i % 2)))
+    assert TruckStatsStore(str(tmp_path / 'stats'), legacy_file=None).aggregate() == s.aggregate()
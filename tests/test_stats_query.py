@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from conftest import berlin_day, truck, write_segment
+from lkw_bot_web import TruckStatsStore, stats_zeitpunkt
+
+
+@pytest.fixture
+def tag():
+    return berlin_day(1)
+
+
+@pytest.fixture
+def s(tmp_path, tag):
+    write_segment(tmp_path / 'stats', tag, [
+        truck(tag, '00:00:00'),
+        truck(tag, '12:00:00'),
+        truck(tag, '12:00:00.250000'),
+        truck(tag, '23:59:59'),
+        truck(tag, '23:59:59.500000'),
+    ])
+    return TruckStatsStore(str(tmp_path / 'stats'), legacy_file=None)
+
+
+def zeiten(records):
+    return [r['timestamp'][11:-6] for r in records]
+
+
+def test_zeitpunkt_ignores_offset_and_keeps_fraction():
+    assert stats_zeitpunkt('2026-05-01T12:00:00+02:00') == stats_zeitpunkt('2026-05-01T12:00:00')
+    assert stats_zeitpunkt('2026-05-01T12:00:00.5') - stats_zeitpunkt('2026-05-01T12:00:00') == 500000
+
+
+def test_bounds_are_inclusive_at_full_precision(s, tag):
+    total, records = s.query(stats_zeitpunkt(f"{tag}T12:00:00"), stats_zeitpunkt(f"{tag}T23:59:59"))
+    assert total == 3
+    assert zeiten(records) == ['12:00:00', '12:00:00.250000', '23:59:59']
+
+
+def test_fraction_after_end_second_is_excluded(s, tag):
+    # Früher: Vergleich der vollen Zeitstempel - 23:59:59.5 liegt hinter end=23:59:59
+    total, _ = s.query(None, stats_zeitpunkt(f"{tag}T23:59:59"))
+    assert total == 4
+
+
+def test_empty_and_inverted_ranges(s, tag):
+    assert s.query(stats_zeitpunkt(f"{tag}T13:00:00"), stats_zeitpunkt(f"{tag}T14:00:00")) == (0, [])
+    assert s.query(stats_zeitpunkt(f"{tag}T14:00:00"), stats_zeitpunkt(f"{tag}T13:00:00")) == (0, [])
+
+
+def test_paging(s):
+    total, seite = s.query(offset=1, limit=2)
+    assert total == 5
+    assert zeiten(seite) == ['12:00:00', '12:00:00.250000']
+    assert zeiten(s.query(offset=4, limit=10)[1]) == ['23:59:59.500000']
+    assert s.query(offset=10, limit=10) == (5, [])
+    assert s.query(limit=0) == (5, [])
+
+
+def test_out_of_order_append_is_inserted_sorted(tmp_path):
+    # Zeitumstellung im Herbst: 02:10 Winterzeit kommt nach 02:30 Sommerzeit
+    s = TruckStatsStore(str(tmp_path / 'stats'), legacy_file=None)
+    tag = berlin_day(0)
+    s.append(truck(tag, '02:30:00', offset='+02:00'))
+    s.append(truck(tag, '02:10:00', offset='+01:00'))
+    s.append(truck(tag, '03:10:00', offset='+01:00'))
+    assert list(s.index_times) == sorted(s.index_times)
+    assert zeiten(s.query()[1]) == ['02:10:00', '02:30:00', '03:10:00']
+
+
+def test_drop_expired_removes_index_entries(tmp_path):
+    alt, neu = berlin_day(40), berlin_day(1)
+    write_segment(tmp_path / 'stats', alt, [truck(alt), truck(alt, '11:00:00')])
+    write_segment(tmp_path / 'stats', neu, [truck(neu)])
+    s = TruckStatsStore(str(tmp_path / 'stats'), legacy_file=None, retention_days=30)
+    assert s.query()[0] == 3
+    s.drop_expired()
+    total, records = s.query()
+    assert total == 1 and records[0]['timestamp'][:10] == neu
+    assert len(s.index_times) == len(s.index_days) == len(s.index_offsets) == 1
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import json
+
+from conftest import berlin_day, truck, write_segment
+from lkw_bot_web import LKW_STATS_SERIES_HOURLY_DAYS, StatsRollup, TruckStatsStore
+
+
+def store(tmp_path, **kwargs):
+    return TruckStatsStore(str(tmp_path / 'stats'), legacy_file=None, retention_days=30, **kwargs)
+
+
+def test_rollup_roundtrip():
+    rollup = StatsRollup()
+    rollup.add(truck('2026-01-01', strength='12,5M', server='7'))
+    rollup.add(truck('2026-01-01', strength='30M', server='8', user=None))
+    wieder = StatsRollup.from_dict(json.loads(json.dumps(rollup.to_dict())))
+    assert wieder.to_dict() == rollup.to_dict()
+
+
+def test_expired_day_moves_into_archive(tmp_path):
+    alt, neu = berlin_day(35), berlin_day(1)
+    write_segment(tmp_path / 'stats', alt, [truck(alt, '10:00:00', '10M', '1'), truck(alt, '10:30:00', '30M', '2'),
+                                            truck(alt, '14:00:00', '20M', '1')])
+    write_segment(tmp_path / 'stats', neu, [truck(neu, '09:00:00', '40M', '3')])
+    s = store(tmp_path)
+    vorher = s.aggregate()
+    s.drop_expired()
+
+    assert s.days() == [neu]
+    assert sorted(s.archive_hourly) == [f"{alt}T10", f"{alt}T14"]
+    assert s.archive_daily[alt].count == 3
+    nachher = s.aggregate()
+    for feld in ('total', 'avg_strength', 'min_strength', 'max_strength', 'daily', 'hourly', 'servers', 'strength_buckets'):
+        assert nachher[feld] == vorher[feld], feld
+
+    # Nach einem Neustart kommen die Zusammenfassungen aus den Dateien
+    assert store(tmp_path).aggregate() == nachher
+
+
+def test_archive_pruned_by_resolution(tmp_path):
+    sehr_alt, alt = berlin_day(120), berlin_day(60)
+    for day in (sehr_alt, alt):
+        write_segment(tmp_path / 'stats', day, [truck(day, '10:00:00', '10M')])
+    s = store(tmp_path, hourly_rollup_days=90, daily_rollup_days=100)
+    s.drop_expired()
+
+    assert list(s.archive_hourly) == [f"{alt}T10"]
+    assert list(s.archive_daily) == [alt]
+    zeilen = (tmp_path / 'stats' / 'rollups_hourly.jsonl').read_text().splitlines()
+    assert [json.loads(z)['key'] for z in zeilen] == [f"{alt}T10"]
+
+
+def test_daily_archive_used_when_hours_are_gone(tmp_path):
+    alt = berlin_day(120)
+    write_segment(tmp_path / 'stats', alt, [truck(alt, '10:00:00', '10M'), truck(alt, '22:00:00', '30M')])
+    s = store(tmp_path, hourly_rollup_days=90)
+    s.drop_expired()
+
+    result = s.aggregate(f"{alt}T00:00:00", f"{alt}T23:59:59")
+    assert result['total'] == 2
+    assert result['daily'] == {alt: 2}
+    assert sum(result['hourly']) == 0  # Ohne Stunden-Zusammenfassung keine Uhrzeit
+    assert result['resolution'] == 'tag'
+    assert result['series'] == [{'count': 2, 'avg_strength': 20.0, 'min_strength': 10.0, 'max_strength': 30.0,
+                                 'time': alt}]
+
+
+def test_day_archived_twice_is_not_counted_twice(tmp_path):
+    # Absturz zwischen Sichern und Löschen: der Tag wird beim nächsten Lauf erneut archiviert
+    alt = berlin_day(35)
+    write_segment(tmp_path / 'stats', alt, [truck(alt)])
+    s = store(tmp_path)
+    with open(s.segment_path(alt), 'rb') as f:
+        inhalt = f.read()
+    s.drop_expired()
+    with open(s.segment_path(alt), 'wb') as f:
+        f.write(inhalt)
+
+    wieder = store(tmp_path)
+    assert wieder.aggregate()['total'] == 1
+    wieder.drop_expired()
+    assert store(tmp_path).aggregate()['total'] == 1
+
+
+def test_series_resolution_follows_requested_span(tmp_path):
+    s = store(tmp_path)
+    heute = berlin_day(0)
+    s.append(truck(heute, '08:00:00'))
+    s.append(truck(heute, '09:00:00'))
+    kurz = s.aggregate(f"{heute}T00:00:00", f"{heute}T23:59:59")
+    assert kurz['resolution'] == 'stunde'
+    assert [p['time'] for p in kurz['series']] == [f"{heute}T08", f"{heute}T09"]
+
+    lang = s.aggregate(f"{berlin_day(LKW_STATS_SERIES_HOURLY_DAYS)}T00:00:00", f"{heute}T23:59:59")
+    assert lang['resolution'] == 'tag'
+    assert lang['series'] == [{'count': 2, 'avg_strength': 12.5, 'min_strength': 12.5, 'max_strength': 12.5,
+                               'time': heute}]
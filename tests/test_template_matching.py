@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import cv2
+import numpy as np
+import pytest
+
+from lkw_bot_web import LKW_MATCH_THRESHOLD, PYRAMID_SCALE, TemplateBank
+
+ROI = (0, 140, 720, 1200)
+
+
+def pattern(seed, width, height):
+    """Grobes Zufallsmuster (4x4-Blöcke) - bleibt auf PYRAMID_SCALE erkennbar"""
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 256, (height // 4, width // 4, 3), dtype=np.uint8)
+    return cv2.resize(blocks, (width, height), interpolation=cv2.INTER_NEAREST)
+
+
+@pytest.fixture
+def bank(tmp_path):
+    files = []
+    for seed, (width, height) in enumerate([(48, 32), (64, 40)]):
+        path = str(tmp_path / f"lkw_{seed}.png")
+        cv2.imwrite(path, pattern(seed, width, height))
+        files.append(path)
+    return TemplateBank(files)
+
+
+# (Template, links, oben): mitten im Band, ungerade Position, unten bündig an der ROI-Kante,
+# rechts bündig am Frame-Rand, über die ROI-Kante hinaus und ganz außerhalb
+PLACEMENTS = [(0, 100, 300), (1, 401, 557), (0, 300, 1200 - 32), (1, 720 - 64, 800),
+              (0, 500, 1180), (1, 200, 40)]
+
+
+def synthetic_frame(bank, channels=3):
+    ys, xs = np.mgrid[0:1280, 0:720]
+    frame = np.dstack([(xs * 0.2 + ys * 0.1) % 256] * 3).astype(np.uint8)
+    for index, x, y in PLACEMENTS:
+        template = cv2.imread(bank.files[index])
+        frame[y:y + template.shape[0], x:x + template.shape[1]] = template
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA) if channels == 4 else frame
+
+
+def reference_hits(bank, frame):
+    """Vollbild-cv2.matchTemplate pro Template, lokale Maxima über der Schwelle, Box ganz in der ROI"""
+    hits = {}
+    for path in bank.files:
+        template = cv2.imread(path)
+        if frame.shape[2] == 4:
+            template = cv2.cvtColor(template, cv2.COLOR_BGR2RGBA)
+        result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+        peaks = (result >= LKW_MATCH_THRESHOLD) & (result == cv2.dilate(result, np.ones((5, 5), np.uint8)))
+        th, tw = template.shape[:2]
+        for y, x in zip(*np.nonzero(peaks)):
+            if ROI[0] <= x and ROI[1] <= y and x + tw <= ROI[2] and y + th <= ROI[3]:
+                hits[(int(x), int(y), path)] = float(result[y, x])
+    return hits
+
+
+@pytest.mark.parametrize('channels', [3, 4])
+def test_roi_pyramid_matches_full_frame_search(bank, channels):
+    frame = synthetic_frame(bank, channels)
+    expected = reference_hits(bank, frame)
+    assert set(expected) == {(x, y, bank.files[i]) for i, x, y in PLACEMENTS[:4]}
+
+    matches = bank.match(frame, rois=[ROI], pyramid=True)
+    assert {(m.x, m.y, m.template) for m in matches} == set(expected)
+    for m in matches:
+        assert m.score == pytest.approx(expected[(m.x, m.y, m.template)], abs=1e-4)
+
+
+def test_roi_pyramid_equals_roi_without_pyramid(bank):
+    frame = synthetic_frame(bank)
+    with_pyramid = bank.match(frame, rois=[ROI], pyramid=True)
+    without = bank.match(frame, rois=[ROI], pyramid=False)
+    assert {(m.x, m.y, m.template): m.score for m in with_pyramid} == \
+        pytest.approx({(m.x, m.y, m.template): m.score for m in without}, abs=1e-4)
+
+
+def test_coarse_windows_are_clamped_to_roi(bank):
+    frame = synthetic_frame(bank)
+    windows = bank._coarse_windows(frame, ROI, bank.entries(), LKW_MATCH_THRESHOLD)
+    assert windows
+    for x1, y1, x2, y2 in windows:
+        assert ROI[0] <= x1 < x2 <= ROI[2] and ROI[1] <= y1 < y2 <= ROI[3]
+    # Jeder Treffer in der ROI liegt vollständig in einem Fenster
+    for index, x, y in PLACEMENTS[:4]:
+        tw, th = bank.entries()[index]['size']
+        assert any(x1 <= x and y1 <= y and x + tw <= x2 and y + th <= y2 for x1, y1, x2, y2 in windows)
+
+
+def test_coarse_windows_empty_without_candidates(bank):
+    ys, xs = np.mgrid[0:1280, 0:720]
+    frame = np.dstack([(xs * 0.2 + ys * 0.1) % 256] * 3).astype(np.uint8)
+    assert bank._coarse_windows(frame, ROI, bank.entries(), LKW_MATCH_THRESHOLD) == []
+    assert bank.match(frame, rois=[ROI], pyramid=True) == []
+    assert PYRAMID_SCALE in bank.scales
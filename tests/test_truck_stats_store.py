@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+
+from conftest import berlin_day, truck, write_segment
+from lkw_bot_web import TruckStatsStore
+
+
+def store(tmp_path, **kwargs):
+    kwargs.setdefault('legacy_file', None)
+    return TruckStatsStore(str(tmp_path / 'stats'), **kwargs)
+
+
+def test_append_writes_one_line_per_day(tmp_path):
+    s = store(tmp_path)
+    heute, gestern = berlin_day(0), berlin_day(1)
+    s.append(truck(gestern))
+    s.append(truck(heute, '09:00:00'))
+    s.append(truck(heute, '10:00:00'))
+    assert s.days() == [gestern, heute]
+    lines = (tmp_path / 'stats' / f"{heute}.jsonl").read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['timestamp'][11:19] for line in lines] == ['09:00:00', '10:00:00']
+
+
+def test_iter_records_skips_broken_lines_and_respects_day_range(tmp_path):
+    d1, d2, d3 = berlin_day(3), berlin_day(2), berlin_day(1)
+    for day in (d1, d2, d3):
+        write_segment(tmp_path / 'stats', day, [truck(day)])
+    with open(tmp_path / 'stats' / f"{d2}.jsonl", 'a') as f:
+        f.write('{"abgebrochen')
+    s = store(tmp_path)
+    assert [r['timestamp'][:10] for r in s.iter_records(d2, d3)] == [d2, d3]
+    assert len(list(s.iter_records())) == 3
+
+
+def test_drop_expired_deletes_only_whole_days_past_retention(tmp_path):
+    alt, grenze = berlin_day(31), berlin_day(30)
+    write_segment(tmp_path / 'stats', alt, [truck(alt)])
+    write_segment(tmp_path / 'stats', grenze, [truck(grenze)])
+    s = store(tmp_path, retention_days=30)
+    s.drop_expired()
+    assert s.days() == [grenze]
+    assert s.query()[0] == 1
+
+
+def test_migration_groups_by_day_and_skips_expired(tmp_path):
+    legacy = tmp_path / 'truck_stats.json'
+    alt, d1, d2 = berlin_day(40), berlin_day(5), berlin_day(4)
+    records = [truck(d2, '08:00:00'), truck(alt), truck(d1), truck(d2, '07:00:00')]
+    legacy.write_text(json.dumps(records))
+    threads_before = threading.active_count()
+
+    s = store(tmp_path, legacy_file=str(legacy), retention_days=30)
+
+    assert threading.active_count() == threads_before
+    assert s.days() == [d1, d2]
+    assert [r['timestamp'][11:19] for r in s.iter_records(d2, d2)] == ['07:00:00', '08:00:00']
+    assert not legacy.exists()
+    assert (tmp_path / 'truck_stats.json.migrated').exists()
+    total, _ = s.query()
+    assert total == 3
+
+
+def test_migration_after_crash_does_not_duplicate(tmp_path):
+    legacy = tmp_path / 'truck_stats.json'
+    d1, d2 = berlin_day(5), berlin_day(4)
+    records = [truck(d1, '07:00:00'), truck(d1, '08:00:00'), truck(d2)]
+    legacy.write_text(json.dumps(records))
+    # Abgebrochener Versuch: Tag d1 schon teilweise geschrieben, danach ein neuer LKW live angehängt,
+    # die alte Datei aber noch nicht umbenannt
+    write_segment(tmp_path / 'stats', d1, [records[0], truck(d1, '20:00:00', user='live')])
+
+    s = store(tmp_path, legacy_file=str(legacy), retention_days=30)
+
+    assert [r['timestamp'][11:19] for r in s.iter_records(d1, d1)] == ['07:00:00', '20:00:00', '08:00:00']
+    assert len(list(s.iter_records(d2, d2))) == 1
+    assert s.query()[0] == 4
+    assert not legacy.exists()
+    assert list((tmp_path / 'stats').glob('*.tmp')) == []
+
+
+def test_broken_legacy_file_is_left_in_place(tmp_path):
+    legacy = tmp_path / 'truck_stats.json'
+    legacy.write_text('[{"kaputt"')
+    s = store(tmp_path, legacy_file=str(legacy))
+    assert legacy.exists()
+    assert s.days() == []